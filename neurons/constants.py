@@ -20,6 +20,45 @@ EVENTS_RETENTION_SIZE = "2 GB"
 VALIDATOR_DEFAULT_REQUEST_FREQUENCY = 60
 VALIDATOR_DEFAULT_QUERY_TIMEOUT = 15
 ENABLE_IMAGE2IMAGE = False
+# Validator steps prepared ahead of the running ones
+STEP_PREFETCH_DEPTH = 1
+# Validator steps (with disjoint UIDs) running at once
+STEPS_IN_FLIGHT = 1
+# Quorum mode: extra miners queried per step, and seconds after
+# which the step stops waiting for the slowest of them
+QUERY_OVERPROVISION = 4
+QUERY_SOFT_TIMEOUT = 12.0
+# Adaptive timeouts: a quantile of the miners' response times
+# plus a relative margin, never below these
+ADAPTIVE_TIMEOUT_QUANTILE = 0.95
+ADAPTIVE_TIMEOUT_MARGIN = 0.5
+ADAPTIVE_QUERY_TIMEOUT_MIN = 4.0
+ADAPTIVE_PROBE_TIMEOUT_MIN = 0.3
+# Background IsAlive probes of every candidate miner: seconds between
+# sweeps, seconds a probe result is trusted, and probes at once
+LIVENESS_PROBE_INTERVAL = 60.0
+LIVENESS_TTL = 300.0
+LIVENESS_PROBE_CONCURRENCY = 32
+# Failed IsAlive probes after which a miner sits out the query epoch
+MAX_PROBE_FAILURES = 3
+# Seconds between background refreshes of the human votes
+VOTES_REFRESH_INTERVAL = 60.0
+# Max images per ImageReward forward pass
+IMAGE_REWARD_BATCH_SIZE = 16
+# Image hashes kept across steps to catch replayed images
+PHASH_INDEX_MAX_SIZE = 2_000_000
+PHASH_INDEX_MAX_AGE = 7 * 24 * 60 * 60
+# Connection pool of the backend client, per process
+BACKEND_MAX_CONNECTIONS = 32
+BACKEND_MAX_KEEPALIVE_CONNECTIONS = 16
+BACKEND_KEEPALIVE_EXPIRY = 60.0
+# Batch uploads to the backend
+UPLOAD_WORKERS = 16
+UPLOAD_MAX_ATTEMPTS = 5
+UPLOAD_MAX_BACKOFF = 30.0
+UPLOAD_METRICS_INTERVAL = 60.0
+UPLOAD_SPOOL_MAX_MEMORY = 64 * 1024 * 1024
+UPLOAD_SPOOL_SEGMENT_SIZE = 16 * 1024 * 1024
 
 IA_VALIDATOR_BLACKLIST = "blacklist_for_validators.json"
 IA_VALIDATOR_WHITELIST = "whitelist_for_validators.json"
@@ -21,6 +21,12 @@ from neurons.utils.image import (
     empty_image_tensor,
 )
 from neurons.utils.log import sh
+from neurons.utils.metagraph import (
+    MetagraphIndex,
+    get_metagraph_index,
+    get_uid,
+    rebuild_metagraph_index,
+)
 from neurons.utils.nsfw import clean_nsfw_from_prompt
 from neurons.miners.StableMiner.utils import (
     get_caller_stake,
@@ -98,6 +104,7 @@ class BaseMiner(ABC):
         self.metagraph: bt.metagraph = self.subtensor.metagraph(
             netuid=self.bt_config.netuid
         )
+        rebuild_metagraph_index(self.metagraph)
 
     def initialize_wallet(self) -> None:
         self.wallet: bt.wallet = bt.wallet(config=self.bt_config)
@@ -202,19 +209,19 @@ class BaseMiner(ABC):
         )
         time.sleep(120)
         self.metagraph.sync(subtensor=self.subtensor)
+        rebuild_metagraph_index(self.metagraph)
 
     def nsfw_image_filter(self, images: List[bt.Tensor]) -> List[bool]:
         clip_input = self.processor(
             [self.transform(image) for image in images],
             return_tensors="pt",
         ).to(self.bt_config.miner.device)
-        images, nsfw = self.safety_checker.forward(
-            images=images,
-            clip_input=clip_input.pixel_values.to(
+        has_nsfw_concept = self.safety_checker.detect_nsfw(
+            clip_input.pixel_values.to(
                 self.bt_config.miner.device,
             ),
         )
-        return nsfw
+        return has_nsfw_concept.tolist()
 
     def get_miner_info(self) -> Dict[str, Union[int, float]]:
         try:
@@ -231,10 +238,7 @@ class BaseMiner(ABC):
             return {}
 
     def get_miner_index(self) -> Optional[int]:
-        try:
-            return self.metagraph.hotkeys.index(self.wallet.hotkey.ss58_address)
-        except ValueError:
-            return None
+        return get_uid(self.metagraph, self.wallet.hotkey.ss58_address)
 
     def check_still_registered(self) -> bool:
         return self.get_miner_index() is not None
@@ -471,16 +475,15 @@ class BaseMiner(ABC):
                     + f" {caller_hotkey} to {priority}"
                 )
 
-            try:
-                caller_uid: int = self.metagraph.hotkeys.index(
-                    synapse.axon.hotkey,
-                )
-                priority = max(priority, float(self.metagraph.S[caller_uid]))
+            index: MetagraphIndex = get_metagraph_index(self.metagraph)
+            caller_uid: Optional[int] = index.get_uid(synapse.axon.hotkey)
+            if caller_uid is not None:
+                priority = max(priority, index.get_stake(caller_uid) or 0.0)
                 logger.info(
                     f"Prioritizing key {synapse.axon.hotkey}"
                     + f" with value: {priority}."
                 )
-            except ValueError:
+            else:
                 logger.warning(
                     #
                     f"Hotkey {synapse.axon.hotkey}"
@@ -635,6 +638,7 @@ class BaseMiner(ABC):
                     # Ensure the metagraph is synced
                     # before the next registration check
                     self.metagraph.sync(subtensor=self.subtensor)
+                    rebuild_metagraph_index(self.metagraph)
                     continue
 
                 # Output current statistics and set weights
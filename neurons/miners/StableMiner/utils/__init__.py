@@ -7,32 +7,21 @@ from loguru import logger
 
 from diffusers import DiffusionPipeline
 from neurons.miners.config import get_metagraph
+from neurons.utils.metagraph import get_coldkey, get_stake
 
 
 def get_caller_stake(synapse: bt.Synapse) -> Optional[float]:
     """
     Look up the stake of the requesting validator.
     """
-    metagraph: bt.metagraph = get_metagraph()
-
-    if synapse.dendrite.hotkey in metagraph.hotkeys:
-        index = metagraph.hotkeys.index(synapse.dendrite.hotkey)
-        return metagraph.S[index].item()
-
-    return None
+    return get_stake(get_metagraph(), synapse.dendrite.hotkey)
 
 
 def get_coldkey_for_hotkey(hotkey: str) -> Optional[str]:
     """
     Look up the coldkey of the caller.
     """
-    metagraph: bt.metagraph = get_metagraph()
-
-    if hotkey in metagraph.hotkeys:
-        index = metagraph.hotkeys.index(hotkey)
-        return metagraph.coldkeys[index]
-
-    return None
+    return get_coldkey(get_metagraph(), hotkey)
 
 
 def warm_up(model: DiffusionPipeline, local_args: Dict):
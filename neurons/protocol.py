@@ -49,6 +49,8 @@ def deserialize_incoming_image(inbound_image: Any):
     if isinstance(inbound_image, dict) and "buffer" in inbound_image:
         # Older miners serializing image as bt.Tensor which is sent as dict
         # { "buffer": "...", "dtype": "torch.uint8", "shape": [3, 1, 1] }
+        # This is the only inbound image that has to be encoded,
+        # every other one is uploaded as sent
         inbound = bt.Tensor(**inbound_image).deserialize()
         return image_to_base64(tensor_to_image(tensor=inbound))
 
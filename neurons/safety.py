@@ -1,4 +1,3 @@
-import numpy as np
 import torch
 import torchvision.transforms as transforms
 from loguru import logger
@@ -35,58 +34,44 @@ class StableDiffusionSafetyChecker(PreTrainedModel):
         )
         self.transform = transforms.Compose([transforms.PILToTensor()])
 
+    def concept_scores(self, image_embeds: torch.Tensor) -> torch.Tensor:
+        """
+        Score every image against every NSFW concept in one go.
+
+        Returns a [num_images, num_concepts] tensor, a concept is present
+        when its score is above zero.
+        """
+        # increase this value to create a stronger `nfsw` filter
+        # at the cost of increasing the possibility of filtering benign
+        # images
+        adjustment = 1.0
+
+        # we always cast to float32 as this does not cause significant
+        # overhead and is compatible with bfloat16
+        cos_dist = cosine_distance(image_embeds, self.concept_embeds).float()
+        thresholds = self.concept_embeds_weights.float() * adjustment
+
+        return torch.round(cos_dist - thresholds, decimals=3)
+
     @torch.no_grad()
-    def forward(self, clip_input, images):
+    def detect_nsfw(self, clip_input: torch.Tensor) -> torch.Tensor:
+        """
+        Run the safety checker over a whole batch of CLIP inputs.
+
+        Returns a boolean tensor with one entry per image.
+        """
         pooled_output = self.vision_model(clip_input)[1]  # pooled_output
         image_embeds = self.visual_projection(pooled_output)
-        # we always cast to float32 as this does not cause significant
-        # overhead and is compatible with bfloat16
-        special_cos_dist = (
-            cosine_distance(image_embeds, self.special_care_embeds)
-            .cpu()
-            .float()
-            .numpy()
-        )
-        cos_dist = (
-            cosine_distance(image_embeds, self.concept_embeds).cpu().float().numpy()
-        )
-        result = []
-        batch_size = image_embeds.shape[0]
-        for i in range(batch_size):
-            result_img = {
-                "special_scores": {},
-                "special_care": [],
-                "concept_scores": {},
-                "bad_concepts": [],
-                "bad_score": 0.0,
-            }
-            # increase this value to create a stronger `nfsw` filter
-            # at the cost of increasing the possibility of filtering benign
-            # images
-            adjustment = 1.0
-            for concept_idx in range(len(special_cos_dist[0])):
-                concept_cos = special_cos_dist[i][concept_idx]
-                concept_threshold = self.special_care_embeds_weights[concept_idx].item()
-                result_img["special_scores"][concept_idx] = round(
-                    concept_cos - (concept_threshold * adjustment), 3
-                )
-                if result_img["special_scores"][concept_idx] > 0:
-                    result_img["special_care"].append(
-                        {concept_idx, result_img["special_scores"][concept_idx]}
-                    )
-            for concept_idx in range(len(cos_dist[0])):
-                concept_cos = cos_dist[i][concept_idx]
-                concept_threshold = self.concept_embeds_weights[concept_idx].item()
-                result_img["concept_scores"][concept_idx] = round(
-                    concept_cos - (concept_threshold * adjustment), 3
-                )
-                if result_img["concept_scores"][concept_idx] > 0:
-                    result_img["bad_concepts"].append(concept_idx)
-                    result_img["bad_score"] += result_img["concept_scores"][concept_idx]
-            result.append(result_img)
-        has_nsfw_concepts = [
-            len(res["bad_concepts"]) > 0 and res["bad_score"] > 0.01 for res in result
-        ]
+
+        scores = self.concept_scores(image_embeds)
+        bad_concepts = scores > 0
+        bad_score = torch.where(bad_concepts, scores, 0.0).sum(dim=-1)
+
+        return (bad_concepts.any(dim=-1) & (bad_score > 0.01)).cpu()
+
+    @torch.no_grad()
+    def forward(self, clip_input, images):
+        has_nsfw_concepts = self.detect_nsfw(clip_input).tolist()
         if any(has_nsfw_concepts):
             logger.warning(
                 "Potential NSFW content was detected in one or more images. "
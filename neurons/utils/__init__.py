@@ -25,11 +25,12 @@ from neurons.constants import (
 )
 from neurons.utils.gcloud import retrieve_public_file
 from neurons.utils.exceptions import BittensorBrokenPipe
-
-from neurons.validator.scoring.models.types import (
-    RewardModelType,
-)
 from neurons.utils.log import configure_logging
+from neurons.utils.metagraph import (
+    get_coldkey,
+    get_uid,
+    rebuild_metagraph_index,
+)
 
 
 # Background Loop
@@ -55,23 +56,50 @@ class MultiprocessBackgroundTimer(multiprocessing.Process):
         self.args = args if args is not None else []
         self.kwargs = kwargs if kwargs is not None else {}
         self.finished = multiprocessing.Event()
+        # Runs inside the process once it stops (can be a coroutine function)
+        self.on_exit = None
 
     def run(self):
         configure_logging()
 
         logger.info(f"{self.function.__name__} started")
 
-        while not self.finished.is_set():
-            try:
-                if inspect.iscoroutinefunction(self.function):
-                    asyncio.run(self.function(*self.args, **self.kwargs))
-                else:
-                    self.function(*self.args, **self.kwargs)
+        # Keep one event loop for the whole process so that
+        # async resources (like pooled connections) survive between calls
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
 
-                self.finished.wait(self.interval)
+        try:
+            while not self.finished.is_set():
+                try:
+                    if inspect.iscoroutinefunction(self.function):
+                        loop.run_until_complete(
+                            self.function(*self.args, **self.kwargs)
+                        )
+                    else:
+                        self.function(*self.args, **self.kwargs)
 
-            except Exception as e:
-                logger.error(traceback.format_exc())
+                    self.finished.wait(self.interval)
+
+                except Exception as e:
+                    logger.error(traceback.format_exc())
+        finally:
+            self.shutdown(loop)
+
+    def shutdown(self, loop: asyncio.AbstractEventLoop):
+        try:
+            if self.on_exit is not None:
+                if inspect.iscoroutinefunction(self.on_exit):
+                    loop.run_until_complete(self.on_exit())
+                else:
+                    self.on_exit()
+
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        except Exception:
+            logger.error(traceback.format_exc())
+        finally:
+            loop.close()
+            logger.info(f"{self.function.__name__} stopped")
 
     def cancel(self):
         self.finished.set()
@@ -81,10 +109,7 @@ def get_coldkey_for_hotkey(self, hotkey):
     """
     Look up the coldkey of the caller.
     """
-    if hotkey in self.metagraph.hotkeys:
-        index = self.metagraph.hotkeys.index(hotkey)
-        return self.metagraph.coldkeys[index]
-    return None
+    return get_coldkey(self.metagraph, hotkey)
 
 
 def background_loop(self, is_validator):
@@ -106,7 +131,8 @@ def background_loop(self, is_validator):
     if self.background_steps % 5 == 0 and self.background_steps > 1:
         try:
             self.metagraph.sync(subtensor=self.subtensor)
-            if self.wallet.hotkey.ss58_address not in self.metagraph.hotkeys:
+            rebuild_metagraph_index(self.metagraph)
+            if get_uid(self.metagraph, self.wallet.hotkey.ss58_address) is None:
                 logger.info(
                     f">>> {neuron_type} has deregistered... terminating."
                 )
@@ -223,6 +249,10 @@ def background_loop(self, is_validator):
 
             # Validator only
             if is_validator:
+                from neurons.validator.scoring.models.types import (
+                    RewardModelType,
+                )
+
                 # Update weights
                 validator_weights = retrieve_public_file(
                     self.storage_client, IA_VALIDATOR_WEIGHT_FILES
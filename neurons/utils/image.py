@@ -1,8 +1,10 @@
 import base64
 import binascii
 import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
 from io import BytesIO
-from typing import List
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import torch
 import numpy as np
@@ -16,6 +18,141 @@ import torchvision.transforms as T
 
 from neurons.protocol import SupportedImageTypes
 
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+class DecodedImage:
+    """
+    All the decoded forms of a single inbound image.
+
+    Each form (PIL image, uint8 tensor and float tensor) is only
+    built the first time it is asked for and then kept around,
+    so every scoring model can share the same decoding work.
+
+    NOTE: The returned objects are shared, do not modify them in place.
+    """
+
+    def __init__(self, inbound: SupportedImageTypes):
+        self.inbound = inbound
+
+        self._image: Optional[ImageType] = None
+        self._uint8_tensor: Optional[torch.Tensor] = None
+        self._float_tensor: Optional[torch.Tensor] = None
+
+    @property
+    def image(self) -> ImageType:
+        """PIL form of the image."""
+        if self._image is None:
+            if isinstance(self.inbound, str):
+                self._image = base64_to_image(self.inbound)
+            else:
+                self._image = tensor_to_image(self.float_tensor)
+
+        return self._image
+
+    @property
+    def uint8_tensor(self) -> torch.Tensor:
+        """[C, H, W] uint8 tensor with values in range (0, 255)."""
+        if self._uint8_tensor is None:
+            if isinstance(self.inbound, str):
+                self._uint8_tensor = T.PILToTensor()(self.image)
+            else:
+                tensor = self.float_tensor
+                if tensor.is_floating_point():
+                    tensor = (tensor * 255).to(torch.uint8)
+
+                self._uint8_tensor = tensor
+
+        return self._uint8_tensor
+
+    @property
+    def float_tensor(self) -> torch.Tensor:
+        """[C, H, W] float tensor with values in range (0.0, 1.0)."""
+        if self._float_tensor is None:
+            if isinstance(self.inbound, str):
+                self._float_tensor = image_to_tensor(self.image)
+            else:
+                self._float_tensor = multi_to_tensor(self.inbound)
+
+        return self._float_tensor
+
+
+class DecodedImageCache:
+    """
+    Decoded images of every response seen during a single validator step.
+
+    Entries are keyed by the response and the image index,
+    and are checked against the inbound image they were decoded from
+    so a recycled response id can never return a stale image.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Tuple[int, int], DecodedImage] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, synapse: bt.Synapse, img_index: int = 0) -> DecodedImage:
+        inbound: SupportedImageTypes = synapse.images[img_index]
+        key: Tuple[int, int] = (id(synapse), img_index)
+
+        decoded: Optional[DecodedImage] = self._entries.get(key)
+        if decoded is None or decoded.inbound is not inbound:
+            decoded = DecodedImage(inbound)
+            self._entries[key] = decoded
+
+        return decoded
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_decoded_image_cache: ContextVar[Optional[DecodedImageCache]] = ContextVar(
+    "decoded_image_cache",
+    default=None,
+)
+
+
+@contextmanager
+def decoded_image_cache() -> Iterator[DecodedImageCache]:
+    """
+    Share decoded images between every consumer inside this block.
+
+    Used around a validator step so each response image is decoded
+    once, no matter how many scoring models look at it.
+    The cache is dropped as soon as the block is left.
+    """
+    cache = DecodedImageCache()
+    token = _decoded_image_cache.set(cache)
+    try:
+        yield cache
+    finally:
+        _decoded_image_cache.reset(token)
+        cache.clear()
+
+
+def decode_synapse_image(
+    synapse: bt.Synapse,
+    img_index: int = 0,
+) -> DecodedImage:
+    """
+    Get the decoded forms of a Synapse image.
+
+    Re-uses the step's decoded image cache when there is one.
+
+    Args:
+        synapse (bt.Synapse): The Synapse response containing images.
+        img_index (int): Index of the image to decode.
+
+    Returns:
+        DecodedImage: The (lazily) decoded image.
+    """
+    cache: Optional[DecodedImageCache] = _decoded_image_cache.get()
+    if cache is None:
+        return DecodedImage(synapse.images[img_index])
+
+    return cache.get(synapse, img_index)
+
 
 def synapse_to_bytesio(synapse: bt.Synapse, img_index: int = 0) -> BytesIO:
     """
@@ -39,10 +176,38 @@ def synapse_to_bytesio(synapse: bt.Synapse, img_index: int = 0) -> BytesIO:
     return buffer
 
 
+def is_base64_png(b64_image: str) -> bool:
+    """
+    Cheap check that a base64 string holds a PNG image.
+
+    Only the PNG signature and the IHDR chunk (with a non-zero size)
+    at the start of the data are decoded, not the whole image.
+    """
+    try:
+        # 32 base64 characters are 24 bytes:
+        # 8 signature + 4 length + 4 "IHDR" + 4 width + 4 height
+        header: bytes = base64.b64decode(b64_image[:32], validate=True)
+    except (TypeError, ValueError):
+        return False
+
+    if len(header) < 24 or not header.startswith(PNG_SIGNATURE):
+        return False
+
+    if header[12:16] != b"IHDR":
+        return False
+
+    width: int = int.from_bytes(header[16:20], "big")
+    height: int = int.from_bytes(header[20:24], "big")
+    return width > 0 and height > 0
+
+
 def synapse_to_base64(synapse: bt.Synapse, img_index: int = 0) -> str:
     """
     Convert a Synapse image to base64 string.
 
+    Base64 PNGs (what miners send) are passed through untouched,
+    anything else is decoded and encoded as a PNG.
+
     Args:
         synapse (bt.Synapse): The Synapse response containing images.
         img_index (int): Index of the image to convert.
@@ -53,6 +218,10 @@ def synapse_to_base64(synapse: bt.Synapse, img_index: int = 0) -> str:
     if not synapse.images:
         return ""
 
+    inbound: SupportedImageTypes = synapse.images[img_index]
+    if isinstance(inbound, str) and is_base64_png(inbound):
+        return inbound
+
     return bytesio_to_base64(synapse_to_bytesio(synapse, img_index))
 
 
@@ -70,7 +239,27 @@ def synapse_to_tensor(synapse: bt.Synapse, img_index: int = 0) -> torch.Tensor:
     if not synapse.images:
         return empty_image_tensor()
 
-    return multi_to_tensor(synapse.images[img_index])
+    return decode_synapse_image(synapse, img_index).float_tensor
+
+
+def synapse_to_uint8_tensor(
+    synapse: bt.Synapse,
+    img_index: int = 0,
+) -> torch.Tensor:
+    """
+    Convert a Synapse image to a uint8 PyTorch Tensor.
+
+    Args:
+        synapse (bt.Synapse): The Synapse response containing images.
+        img_index (int): Index of the image to convert.
+
+    Returns:
+        torch.Tensor: The converted [C, H, W] uint8 Tensor.
+    """
+    if not synapse.images:
+        return empty_image_tensor()
+
+    return decode_synapse_image(synapse, img_index).uint8_tensor
 
 
 def synapse_to_image(synapse: bt.Synapse, img_index: int = 0) -> Image.Image:
@@ -85,7 +274,7 @@ def synapse_to_image(synapse: bt.Synapse, img_index: int = 0) -> Image.Image:
     if not synapse.images:
         return empty_image()
 
-    return tensor_to_image(synapse_to_tensor(synapse, img_index))
+    return decode_synapse_image(synapse, img_index).image
 
 
 def synapse_to_images(synapse: bt.Synapse) -> List[ImageType]:
@@ -122,6 +311,23 @@ def synapse_to_tensors(synapse: bt.Synapse) -> List[torch.Tensor]:
     ]
 
 
+def synapse_to_uint8_tensors(synapse: bt.Synapse) -> List[torch.Tensor]:
+    """
+    Convert all Synapse images to uint8 PyTorch Tensors.
+
+    Args:
+        synapse (bt.Synapse): The Synapse response containing images.
+
+    Returns:
+        List[torch.Tensor]: List of converted [C, H, W] uint8 Tensors.
+    """
+    return [
+        #
+        synapse_to_uint8_tensor(synapse, idx)
+        for idx in range(len(synapse.images))
+    ]
+
+
 def multi_to_tensor(inbound: SupportedImageTypes) -> torch.Tensor:
     """
     Convert a Synapse image to PyTorch Tensor.
@@ -276,7 +482,7 @@ def bytesio_to_base64(image: BytesIO) -> str:
     Returns:
         str: The base64 encoded string of the data.
     """
-    return base64.b64encode(image.getvalue())
+    return base64.b64encode(image.getvalue()).decode("utf-8")
 
 
 def base64_to_image(b64_image: str) -> ImageType:
@@ -0,0 +1,178 @@
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import bittensor as bt
+import torch
+
+
+def get_snapshot(metagraph: bt.metagraph) -> object:
+    """
+    The object a metagraph sync replaces.
+
+    bittensor rebuilds `axons` on every sync and derives `hotkeys`
+    and `coldkeys` from it on each access. Simpler stand-ins
+    (like the test mocks) just hold a plain `hotkeys` list.
+    """
+    axons = getattr(metagraph, "axons", None)
+    if isinstance(axons, list):
+        return axons
+
+    return metagraph.hotkeys
+
+
+class MetagraphIndex:
+    """
+    Constant time lookups into one synced state of a metagraph.
+
+    An index is never updated in place: a new one is swapped in
+    whenever the metagraph syncs.
+    """
+
+    def __init__(self, metagraph: bt.metagraph):
+        self.metagraph = metagraph
+        self.snapshot = get_snapshot(metagraph)
+
+        self.hotkeys: List[str] = list(metagraph.hotkeys)
+        self.coldkeys: List[str] = list(getattr(metagraph, "coldkeys", []))
+        self.stakes: List[float] = [
+            float(stake) for stake in getattr(metagraph, "S", [])
+        ]
+
+        # Keep the first UID of a hotkey, same as list.index
+        self.uids: Dict[str, int] = {}
+        for uid, hotkey in enumerate(self.hotkeys):
+            self.uids.setdefault(hotkey, uid)
+
+        # Masks are built on first use, for this state only
+        self.available_masks: Dict[float, torch.BoolTensor] = {}
+        self.blacklist_mask: Optional[
+            Tuple[FrozenSet[str], FrozenSet[str], torch.BoolTensor]
+        ] = None
+
+    def is_current(self, metagraph: bt.metagraph) -> bool:
+        if self.metagraph is not metagraph:
+            return False
+
+        return self.snapshot is get_snapshot(metagraph)
+
+    def get_uid(self, hotkey: str) -> Optional[int]:
+        return self.uids.get(hotkey)
+
+    def get_coldkey(self, uid: int) -> Optional[str]:
+        if 0 <= uid < len(self.coldkeys):
+            return self.coldkeys[uid]
+
+        return None
+
+    def get_stake(self, uid: int) -> Optional[float]:
+        if 0 <= uid < len(self.stakes):
+            return self.stakes[uid]
+
+        return None
+
+    def get_available_mask(self, vpermit_tao_limit: float) -> torch.BoolTensor:
+        """
+        UIDs that are serving, without validators
+        staking more than `vpermit_tao_limit`
+        """
+        mask: Optional[torch.BoolTensor] = self.available_masks.get(
+            vpermit_tao_limit
+        )
+        if mask is not None:
+            return mask
+
+        metagraph: bt.metagraph = self.metagraph
+        serving = torch.tensor(
+            [axon.is_serving for axon in metagraph.axons],
+            dtype=torch.bool,
+        )
+        permit = torch.as_tensor(metagraph.validator_permit).cpu().bool()
+        stake = torch.as_tensor(metagraph.S).cpu().float()
+
+        mask = serving & ~(permit & (stake > vpermit_tao_limit))
+        self.available_masks[vpermit_tao_limit] = mask
+        return mask
+
+    def get_blacklist_mask(
+        self,
+        hotkey_blacklist: Iterable[str],
+        coldkey_blacklist: Iterable[str],
+    ) -> torch.BoolTensor:
+        """UIDs whose hotkey or coldkey is blacklisted"""
+        hotkeys: FrozenSet[str] = frozenset(hotkey_blacklist)
+        coldkeys: FrozenSet[str] = frozenset(coldkey_blacklist)
+
+        cached = self.blacklist_mask
+        if cached is not None and cached[:2] == (hotkeys, coldkeys):
+            return cached[2]
+
+        coldkeys_by_uid: List[Optional[str]] = self.coldkeys or [None] * len(
+            self.hotkeys
+        )
+        mask = torch.tensor(
+            [
+                hotkey in hotkeys or coldkey in coldkeys
+                for hotkey, coldkey in zip(self.hotkeys, coldkeys_by_uid)
+            ],
+            dtype=torch.bool,
+        )
+
+        self.blacklist_mask = (hotkeys, coldkeys, mask)
+        return mask
+
+    def get_eligible_mask(
+        self,
+        vpermit_tao_limit: float,
+        hotkey_blacklist: Iterable[str],
+        coldkey_blacklist: Iterable[str],
+    ) -> torch.BoolTensor:
+        """UIDs that can be queried at all, alive or not"""
+        return self.get_available_mask(
+            vpermit_tao_limit
+        ) & ~self.get_blacklist_mask(hotkey_blacklist, coldkey_blacklist)
+
+
+metagraph_index: Optional[MetagraphIndex] = None
+
+
+def rebuild_metagraph_index(metagraph: bt.metagraph) -> MetagraphIndex:
+    """Call after every metagraph sync."""
+    global metagraph_index
+
+    # Built aside and swapped in with a single assignment,
+    # so readers never see a half built index
+    new_index = MetagraphIndex(metagraph)
+    metagraph_index = new_index
+
+    return new_index
+
+
+def get_metagraph_index(metagraph: bt.metagraph) -> MetagraphIndex:
+    index: Optional[MetagraphIndex] = metagraph_index
+    if index is None or not index.is_current(metagraph):
+        index = rebuild_metagraph_index(metagraph)
+
+    return index
+
+
+def get_uid(metagraph: bt.metagraph, hotkey: str) -> Optional[int]:
+    return get_metagraph_index(metagraph).get_uid(hotkey)
+
+
+def get_coldkey(metagraph: bt.metagraph, hotkey: str) -> Optional[str]:
+    index: MetagraphIndex = get_metagraph_index(metagraph)
+
+    uid: Optional[int] = index.get_uid(hotkey)
+    if uid is None:
+        return None
+
+    return index.get_coldkey(uid)
+
+
+def get_stake(metagraph: bt.metagraph, hotkey: str) -> Optional[float]:
+    index: MetagraphIndex = get_metagraph_index(metagraph)
+
+    uid: Optional[int] = index.get_uid(hotkey)
+    if uid is None:
+        return None
+
+    return index.get_stake(uid)
@@ -1,6 +1,8 @@
+import asyncio
 import base64
+import importlib.util
 import time
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 import bittensor as bt
 import httpx
@@ -29,8 +31,13 @@ from neurons.validator.backend.models import TaskState
 from neurons.validator.schemas import Batch
 
 
+def is_http2_available() -> bool:
+    """httpx only speaks HTTP/2 with the optional `h2` package"""
+    return importlib.util.find_spec("h2") is not None
+
+
 class TensorAlchemyBackendClient:
-    def __init__(self, hotkey: bt.Keypair = None):
+    def __init__(self, hotkey: bt.Keypair = None, api_url: str = None):
         self.config = get_config()
 
         if hotkey:
@@ -45,20 +52,72 @@ class TensorAlchemyBackendClient:
         if self.config.alchemy.force_prod:
             self.api_url = PROD_URL
 
+        if api_url:
+            self.api_url = api_url
+
+        # One pooled client per process (and event loop),
+        # so connections to the backend are kept alive between calls
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Last votes received, and their ETag
+        self._votes: Optional[Dict] = None
+        self._votes_etag: Optional[str] = None
+
         logger.info(f"Using backend server {self.api_url}")
 
-    def _client(self):
-        """Create client"""
+    def _create_client(self) -> httpx.AsyncClient:
+        http2: bool = self.config.alchemy.backend_http2
+        if http2 and not is_http2_available():
+            logger.warning(
+                "HTTP/2 to the backend needs the h2 package, using HTTP/1.1"
+            )
+            http2 = False
+
         return httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=self.config.alchemy.backend_max_connections,
+                max_keepalive_connections=(
+                    self.config.alchemy.backend_max_keepalive_connections
+                ),
+                keepalive_expiry=self.config.alchemy.backend_keepalive_expiry,
+            ),
             event_hooks={
                 "request": [
                     # Add signature to request
                     self._sign_request,
                     self._include_validator_version,
                 ]
-            }
+            },
         )
 
+    def _client(self) -> httpx.AsyncClient:
+        """Get the pooled client for the running event loop"""
+        loop = asyncio.get_running_loop()
+
+        # Pooled connections belong to the loop that opened them
+        if (
+            self._http_client is None
+            or self._http_client.is_closed
+            or self._http_client_loop is not loop
+        ):
+            self._http_client = self._create_client()
+            self._http_client_loop = loop
+
+        return self._http_client
+
+    async def close(self) -> None:
+        """Close pooled connections, call before the event loop stops"""
+        client: Optional[httpx.AsyncClient] = self._http_client
+        self._http_client = None
+        self._http_client_loop = None
+
+        if client is None or client.is_closed:
+            return
+
+        await client.aclose()
+
     # Get tasks from the client server
     async def poll_task(self, timeout: int = 60, backoff: int = 1):
         """Performs polling for new task.
@@ -96,10 +155,10 @@ class TensorAlchemyBackendClient:
         Returns task or None if there is no pending task
         """
         try:
-            async with self._client() as client:
-                response = await client.get(
-                    f"{self.api_url}/tasks", timeout=timeout
-                )
+            client: httpx.AsyncClient = self._client()
+            response = await client.get(
+                f"{self.api_url}/tasks", timeout=timeout
+            )
         except httpx.ReadTimeout as ex:
             raise GetTaskError(f"/tasks read timeout ({timeout}s)") from ex
         except Exception as ex:
@@ -131,21 +190,37 @@ class TensorAlchemyBackendClient:
         )
 
     async def get_votes(self, timeout: int = 3) -> Dict:
-        """Get human votes from backend"""
+        """
+        Get human votes from backend
+
+        Conditional on the ETag of the last votes received: when they
+        haven't changed, the very same object is returned again.
+        """
+        headers: Dict[str, str] = {}
+        if self._votes_etag:
+            headers["If-None-Match"] = self._votes_etag
+
         try:
-            async with self._client() as client:
-                response = await client.get(
-                    f"{self.api_url}/votes", timeout=timeout
-                )
+            client: httpx.AsyncClient = self._client()
+            response = await client.get(
+                f"{self.api_url}/votes", timeout=timeout, headers=headers
+            )
         except httpx.ReadTimeout:
             raise GetVotesError(f"/votes read timeout({timeout}s)")
 
+        if response.status_code == 304 and self._votes is not None:
+            return self._votes
+
         if response.status_code != 200:
             raise GetVotesError(
                 f"/votes failed with status_code {response.status_code}: "
                 f"{self._error_response_text(response)}"
             )
-        return response.json()
+
+        etag = response.headers.get("ETag")
+        self._votes_etag = etag if isinstance(etag, str) else None
+        self._votes = response.json()
+        return self._votes
 
     async def post_moving_averages(
         self,
@@ -155,20 +230,20 @@ class TensorAlchemyBackendClient:
     ) -> None:
         """Post moving averages"""
         try:
-            async with self._client() as client:
-                response = await client.post(
-                    f"{self.api_url}/validator/averages",
-                    json={
-                        "averages": {
-                            hotkey: moving_average.item()
-                            for hotkey, moving_average in zip(
-                                hotkeys, moving_average_scores
-                            )
-                        }
-                    },
-                    headers={"Content-Type": "application/json"},
-                    timeout=timeout,
-                )
+            client: httpx.AsyncClient = self._client()
+            response = await client.post(
+                f"{self.api_url}/validator/averages",
+                json={
+                    "averages": {
+                        hotkey: moving_average.item()
+                        for hotkey, moving_average in zip(
+                            hotkeys, moving_average_scores
+                        )
+                    }
+                },
+                headers={"Content-Type": "application/json"},
+                timeout=timeout,
+            )
         except httpx.ReadTimeout:
             raise PostMovingAveragesError(
                 f"failed to post moving averages - read timeout ({timeout}s)"
@@ -182,12 +257,12 @@ class TensorAlchemyBackendClient:
 
     async def post_batch(self, batch: Batch, timeout: int = 10) -> Response:
         """Post batch of images"""
-        async with self._client() as client:
-            response = await client.post(
-                f"{self.api_url}/batches",
-                json=batch.dict(),
-                timeout=timeout,
-            )
+        client: httpx.AsyncClient = self._client()
+        response = await client.post(
+            f"{self.api_url}/batches",
+            json=batch.dict(),
+            timeout=timeout,
+        )
         return response
 
     async def post_weights(
@@ -195,19 +270,17 @@ class TensorAlchemyBackendClient:
     ) -> None:
         """Post weights"""
         try:
-            async with self._client() as client:
-                response = await client.post(
-                    f"{self.api_url}/validator/weights",
-                    json={
-                        "weights": {
-                            hotkey: moving_average.item()
-                            for hotkey, moving_average in zip(
-                                hotkeys, raw_weights
-                            )
-                        }
-                    },
-                    timeout=timeout,
-                )
+            client: httpx.AsyncClient = self._client()
+            response = await client.post(
+                f"{self.api_url}/validator/weights",
+                json={
+                    "weights": {
+                        hotkey: moving_average.item()
+                        for hotkey, moving_average in zip(hotkeys, raw_weights)
+                    }
+                },
+                timeout=timeout,
+            )
         except httpx.ReadTimeout:
             raise PostWeightsError(
                 f"failed to post weights - read timeout ({timeout}s)"
@@ -235,8 +308,8 @@ class TensorAlchemyBackendClient:
 
         endpoint = f"{self.api_url}/tasks/{task_id}/{suffix}"
 
-        async with self._client() as client:
-            response = await client.post(endpoint, timeout=timeout)
+        client: httpx.AsyncClient = self._client()
+        response = await client.post(endpoint, timeout=timeout)
         if response.status_code != 200:
             raise UpdateTaskError(
                 f"updating task state failed with status_code "
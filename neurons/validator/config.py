@@ -9,7 +9,28 @@ import torch
 from loguru import logger
 
 from neurons.constants import (
+    ADAPTIVE_TIMEOUT_MARGIN,
+    ADAPTIVE_TIMEOUT_QUANTILE,
+    BACKEND_KEEPALIVE_EXPIRY,
+    BACKEND_MAX_CONNECTIONS,
+    BACKEND_MAX_KEEPALIVE_CONNECTIONS,
     IS_TEST,
+    LIVENESS_PROBE_CONCURRENCY,
+    LIVENESS_PROBE_INTERVAL,
+    LIVENESS_TTL,
+    PHASH_INDEX_MAX_AGE,
+    PHASH_INDEX_MAX_SIZE,
+    QUERY_OVERPROVISION,
+    QUERY_SOFT_TIMEOUT,
+    STEP_PREFETCH_DEPTH,
+    STEPS_IN_FLIGHT,
+    UPLOAD_MAX_ATTEMPTS,
+    UPLOAD_MAX_BACKOFF,
+    UPLOAD_METRICS_INTERVAL,
+    UPLOAD_SPOOL_MAX_MEMORY,
+    UPLOAD_SPOOL_SEGMENT_SIZE,
+    UPLOAD_WORKERS,
+    VOTES_REFRESH_INTERVAL,
 )
 
 
@@ -85,6 +106,159 @@ def add_args(parser):
         help="Port number for streamlit app",
         default=None,
     )
+    parser.add_argument(
+        "--alchemy.phash_index_size",
+        type=int,
+        default=PHASH_INDEX_MAX_SIZE,
+        help="Image hashes kept to catch replayed images (0 disables)",
+    )
+    parser.add_argument(
+        "--alchemy.phash_index_max_age",
+        type=float,
+        default=PHASH_INDEX_MAX_AGE,
+        help="Seconds an image hash is kept to catch replayed images",
+    )
+    parser.add_argument(
+        "--alchemy.step_prefetch_depth",
+        type=int,
+        default=STEP_PREFETCH_DEPTH,
+        help="Validator steps (UIDs and task) prepared ahead of time",
+    )
+    parser.add_argument(
+        "--alchemy.steps_in_flight",
+        type=int,
+        default=STEPS_IN_FLIGHT,
+        help="Validator steps querying disjoint sets of miners at once",
+    )
+    parser.add_argument(
+        "--alchemy.query_quorum",
+        type=int,
+        default=0,
+        help="Stop a step's query once this many miners responded "
+        + "successfully, cutting off the rest (0 waits for every miner)",
+    )
+    parser.add_argument(
+        "--alchemy.query_overprovision",
+        type=int,
+        default=QUERY_OVERPROVISION,
+        help="Extra miners queried per step when a quorum is set",
+    )
+    parser.add_argument(
+        "--alchemy.query_soft_timeout",
+        type=float,
+        default=QUERY_SOFT_TIMEOUT,
+        help="Seconds before a step stops waiting when a quorum is set",
+    )
+    parser.add_argument(
+        "--alchemy.adaptive_timeout",
+        action="store_true",
+        default=False,
+        help="Derive query and IsAlive timeouts from the response times "
+        + "of the miners queried, capped by query_timeout / async_timeout",
+    )
+    parser.add_argument(
+        "--alchemy.adaptive_timeout_quantile",
+        type=float,
+        default=ADAPTIVE_TIMEOUT_QUANTILE,
+        help="Quantile of the response times adaptive timeouts start from",
+    )
+    parser.add_argument(
+        "--alchemy.adaptive_timeout_margin",
+        type=float,
+        default=ADAPTIVE_TIMEOUT_MARGIN,
+        help="Relative margin added on top of that quantile",
+    )
+    parser.add_argument(
+        "--alchemy.liveness_interval",
+        type=float,
+        default=LIVENESS_PROBE_INTERVAL,
+        help="Seconds between background IsAlive probes of every miner "
+        + "(0 disables them, miners are then probed every step)",
+    )
+    parser.add_argument(
+        "--alchemy.liveness_ttl",
+        type=float,
+        default=LIVENESS_TTL,
+        help="Seconds a background IsAlive probe result is trusted",
+    )
+    parser.add_argument(
+        "--alchemy.liveness_concurrency",
+        type=int,
+        default=LIVENESS_PROBE_CONCURRENCY,
+        help="Background IsAlive probes sent at once",
+    )
+    parser.add_argument(
+        "--alchemy.votes_refresh_interval",
+        type=float,
+        default=VOTES_REFRESH_INTERVAL,
+        help="Seconds between background refreshes of the human votes",
+    )
+    parser.add_argument(
+        "--alchemy.backend_max_connections",
+        type=int,
+        default=BACKEND_MAX_CONNECTIONS,
+        help="Max open connections to the backend, per process",
+    )
+    parser.add_argument(
+        "--alchemy.backend_max_keepalive_connections",
+        type=int,
+        default=BACKEND_MAX_KEEPALIVE_CONNECTIONS,
+        help="Max idle connections kept alive to the backend, per process",
+    )
+    parser.add_argument(
+        "--alchemy.backend_keepalive_expiry",
+        type=float,
+        default=BACKEND_KEEPALIVE_EXPIRY,
+        help="Seconds an idle backend connection is kept alive",
+    )
+    parser.add_argument(
+        "--alchemy.backend_http2",
+        action="store_true",
+        default=False,
+        help="Use HTTP/2 for the backend (needs the h2 package)",
+    )
+    parser.add_argument(
+        "--alchemy.upload_workers",
+        type=int,
+        default=UPLOAD_WORKERS,
+        help="Batches uploaded to the backend concurrently",
+    )
+    parser.add_argument(
+        "--alchemy.upload_max_attempts",
+        type=int,
+        default=UPLOAD_MAX_ATTEMPTS,
+        help="Attempts to upload a batch before giving up on it",
+    )
+    parser.add_argument(
+        "--alchemy.upload_max_backoff",
+        type=float,
+        default=UPLOAD_MAX_BACKOFF,
+        help="Max seconds to wait between attempts to upload a batch",
+    )
+    parser.add_argument(
+        "--alchemy.upload_metrics_interval",
+        type=float,
+        default=UPLOAD_METRICS_INTERVAL,
+        help="Seconds between batch upload metrics reports",
+    )
+    parser.add_argument(
+        "--alchemy.upload_spool",
+        action="store_true",
+        default=False,
+        help="Keep batches waiting for upload on disk, across restarts",
+    )
+    parser.add_argument(
+        "--alchemy.upload_spool_max_memory",
+        type=int,
+        default=UPLOAD_SPOOL_MAX_MEMORY,
+        help="Bytes of spooled batches read ahead into memory",
+    )
+    parser.add_argument(
+        "--alchemy.upload_spool_segment_size",
+        type=int,
+        default=UPLOAD_SPOOL_SEGMENT_SIZE,
+        help="Bytes per upload spool segment file",
+    )
 
     # Add arguments for validator settings (downloaded)
     parser.add_argument(
@@ -239,6 +413,17 @@ def get_backend_client() -> "TensorAlchemyBackendClient":
     return backend_client
 
 
+async def close_backend_client() -> None:
+    """Close the pooled connections of this process' backend client"""
+    if not backend_client:
+        return
+
+    try:
+        await backend_client.close()
+    except Exception as e:
+        logger.error(f"Failed to close backend client: {e}")
+
+
 def get_device(new_device: Optional[torch.device] = None) -> torch.device:
     global device
     if not device:
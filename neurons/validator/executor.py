@@ -0,0 +1,184 @@
+import asyncio
+import time
+import traceback
+from typing import TYPE_CHECKING, List, Optional, Set
+
+import sentry_sdk
+import torch
+from loguru import logger
+from pydantic import BaseModel, ConfigDict
+
+from neurons.constants import N_NEURONS
+from neurons.protocol import ImageGenerationTaskModel, ModelType
+from neurons.validator.utils import get_random_uids
+
+if TYPE_CHECKING:
+    from neurons.validator.validator import StableValidator
+
+
+class PreparedStep(BaseModel):
+    """Everything a validator step needs before it can query miners"""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    task: ImageGenerationTaskModel
+    uids: torch.Tensor
+    model_type: ModelType
+    prepared_at: float
+
+
+class StepPrefetcher:
+    """
+    Prepares upcoming validator steps in the background.
+
+    While steps query and score miners, the UIDs and the tasks of the
+    next ones are fetched. At most `depth` steps are prepared (or being
+    prepared) ahead of the running ones, and steps are handed out in
+    the order they were prepared.
+
+    The UIDs of a step stay reserved until it is released, so steps
+    running at the same time never query the same miners.
+    """
+
+    def __init__(
+        self,
+        validator: "StableValidator",
+        depth: int,
+        retry_delay: float = 1.0,
+    ):
+        self.validator = validator
+        self.depth = max(depth, 1)
+        self.retry_delay = retry_delay
+
+        self.steps: asyncio.Queue = asyncio.Queue()
+        # A slot is taken before preparing a step and freed
+        # once the step has been handed out
+        self.slots = asyncio.Semaphore(self.depth)
+        self.tasks: List[asyncio.Task] = []
+
+        # UIDs of every prepared step that hasn't been released yet
+        self.reserved_uids: Set[int] = set()
+        self.uids_lock = asyncio.Lock()
+
+    def uids_per_step(self) -> int:
+        config = self.validator.config
+        if config.alchemy.query_quorum <= 0:
+            return N_NEURONS
+
+        # Query a few more miners than needed, the slowest are cut off
+        return max(N_NEURONS, config.alchemy.query_quorum) + max(
+            config.alchemy.query_overprovision, 0
+        )
+
+    async def reserve_uids(self) -> torch.Tensor:
+        # One at a time, so no two steps are given the same UIDs
+        async with self.uids_lock:
+            uids: torch.Tensor = await get_random_uids(
+                self.validator,
+                k=self.uids_per_step(),
+                exclude=list(self.reserved_uids),
+            )
+            self.reserved_uids.update(uids.tolist())
+
+        return uids
+
+    def release(self, step: "PreparedStep") -> None:
+        """Make the UIDs of a finished step available again"""
+        self.reserved_uids.difference_update(step.uids.tolist())
+
+    async def prepare_step(self) -> Optional[PreparedStep]:
+        validator: "StableValidator" = self.validator
+
+        try:
+            uids: torch.Tensor = await self.reserve_uids()
+        except Exception as e:
+            logger.error(
+                #
+                "Failed to get random uids from metagraph: "
+                + str(e)
+            )
+            return None
+
+        if uids.numel() == 0:
+            logger.warning("No available UIDs left for another step")
+            return None
+
+        try:
+            task: Optional[ImageGenerationTaskModel] = (
+                await validator.get_image_generation_task()
+            )
+        except BaseException:
+            self.reserved_uids.difference_update(uids.tolist())
+            raise
+
+        if task is None:
+            self.reserved_uids.difference_update(uids.tolist())
+
+            logger.warning(
+                "image generation task was not generated successfully."
+            )
+
+            # Prevent loop from forming if the task
+            # error occurs on the first step
+            if validator.step == 0:
+                validator.step += 1
+
+            return None
+
+        return PreparedStep(
+            task=task,
+            uids=uids.to(validator.device),
+            model_type=validator.model_type,
+            prepared_at=time.time(),
+        )
+
+    async def prepare_steps(self) -> None:
+        while not self.validator.should_quit.is_set():
+            await self.slots.acquire()
+
+            step: Optional[PreparedStep] = None
+            try:
+                step = await self.prepare_step()
+            except Exception as e:
+                logger.error(traceback.format_exc())
+                sentry_sdk.capture_exception(e)
+
+            if step is None:
+                self.slots.release()
+                # Don't hammer the miners and the backend on errors
+                await asyncio.sleep(self.retry_delay)
+                continue
+
+            await self.steps.put(step)
+
+    def start(self) -> None:
+        # One preparing task per slot, so slow task fetches overlap
+        self.tasks = [task for task in self.tasks if not task.done()]
+        while len(self.tasks) < self.depth:
+            self.tasks.append(asyncio.create_task(self.prepare_steps()))
+
+    async def stop(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    async def next_step(self, timeout: float = 1.0) -> Optional[PreparedStep]:
+        """The next prepared step, None if there was none within `timeout`"""
+        # Restart preparing steps if it ever died
+        self.start()
+
+        try:
+            step: PreparedStep = await asyncio.wait_for(
+                self.steps.get(), timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            return None
+
+        self.slots.release()
+
+        logger.info(
+            f"Running step prepared {time.time() - step.prepared_at:.2f}s ago"
+        )
+        return step
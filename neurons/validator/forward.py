@@ -1,7 +1,7 @@
 import json
 import asyncio
 import time
-from typing import AsyncIterator, Dict, List, Optional, Tuple
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
 
 from datetime import datetime
 
@@ -11,21 +11,27 @@ import torchvision.transforms as T
 from bittensor import AxonInfo
 from loguru import logger
 
-from neurons.constants import MOVING_AVERAGE_ALPHA
+from neurons.constants import (
+    ADAPTIVE_QUERY_TIMEOUT_MIN,
+    MOVING_AVERAGE_ALPHA,
+)
 from neurons.protocol import ImageGeneration, ImageGenerationTaskModel
 
 from neurons.utils.exceptions import BittensorBrokenPipe
 from neurons.utils.defaults import Stats
 from neurons.utils.log import image_to_str
+from neurons.utils.metagraph import MetagraphIndex, get_metagraph_index
 from neurons.utils.image import (
     synapse_to_base64,
     empty_image_tensor,
+    decoded_image_cache,
 )
 
 from neurons.validator.backend.exceptions import PostMovingAveragesError
 from neurons.validator.event import EventSchema, convert_enum_keys_to_strings
+from neurons.validator.latency import LatencyTracker
 from neurons.validator.schemas import Batch
-from neurons.validator.utils import ttl_get_block
+from neurons.validator.utils import ttl_get_block, zero_blacklisted
 from neurons.validator.scoring.models.types import RewardModelType
 from neurons.validator.config import (
     get_config,
@@ -46,17 +52,14 @@ transform = T.Compose([T.PILToTensor()])
 
 
 def log_moving_averages(moving_average_scores: torch.FloatTensor) -> None:
-    for uid in range(1, 255):
-        try:
-            score = float(moving_average_scores[uid])
-            score_log = f"{score:.4f}"
-            if score > 0:
-                logger.info(
-                    f"miner_uid={uid}, miner_score={score_log}",
-                    extra={"miner_uid": uid, "miner_score": score},
-                )
-        except IndexError:
-            continue
+    scores: torch.Tensor = moving_average_scores[1:255].cpu()
+    for uid in (torch.nonzero(scores > 0).flatten() + 1).tolist():
+        score = float(moving_average_scores[uid])
+        score_log = f"{score:.4f}"
+        logger.info(
+            f"miner_uid={uid}, miner_score={score_log}",
+            extra={"miner_uid": uid, "miner_score": score},
+        )
 
 
 async def update_moving_averages(
@@ -133,11 +136,12 @@ async def update_moving_averages(
         logger.error(f"failed to post moving averages: {e}")
 
     try:
-        for i, (hotkey, coldkey) in enumerate(
-            zip(metagraph.hotkeys, metagraph.coldkeys)
-        ):
-            if hotkey in hotkey_blacklist or coldkey in coldkey_blacklist:
-                updated_ma_scores[i] = 0
+        updated_ma_scores = zero_blacklisted(
+            updated_ma_scores,
+            metagraph,
+            hotkey_blacklist,
+            coldkey_blacklist,
+        )
 
     except Exception as e:
         logger.error(f"An unexpected error occurred (E1): {e}")
@@ -145,10 +149,32 @@ async def update_moving_averages(
     return updated_ma_scores
 
 
+CUT_OFF_MESSAGE = "Cut off once the quorum was reached"
+
+
+def cut_off_response(
+    synapse: bt.Synapse,
+    axon: bt.AxonInfo,
+) -> bt.Synapse:
+    """What a miner cut off by the quorum is recorded as: a timeout"""
+    response: bt.Synapse = synapse.model_copy(deep=True)
+    response.axon = bt.TerminalInfo(
+        ip=axon.ip,
+        port=axon.port,
+        hotkey=axon.hotkey,
+    )
+    response.dendrite.status_code = 408
+    response.dendrite.status_message = CUT_OFF_MESSAGE
+    return response
+
+
 async def query_axons_async(
     dendrite: bt.dendrite,
     axons: List[bt.AxonInfo],
     synapse: bt.Synapse,
+    quorum: int = 0,
+    soft_timeout: Optional[float] = None,
+    timeout: Optional[float] = None,
 ) -> AsyncIterator[Tuple[int, bt.Synapse]]:
     """
     Asynchronously queries a list of axons and yields the responses.
@@ -156,13 +182,25 @@ async def query_axons_async(
         dendrite (bt.dendrite): The dendrite instance to use for querying.
         axons (List[AxonInfo]): The list of axons to query.
         synapse (bt.Synapse): The synapse object to use for the query.
+        quorum (int): Stop once this many successful responses arrived,
+            0 waits for every axon.
+        soft_timeout (float): Stop after this many seconds in quorum mode.
+        timeout (float): Timeout of each query, defaults to query_timeout.
     Yields:
         Tuple[int, bt.Synapse]: The UID of the axon and the filled Synapse object.
+            Axons cut off early are yielded last, as timed out responses.
     """
     metagraph: bt.metagraph = get_metagraph()
 
+    index: MetagraphIndex = get_metagraph_index(metagraph)
+
+    if timeout is None:
+        timeout = get_config().alchemy.query_timeout
+
     async def do_call(inbound_axon: bt.AxonInfo) -> Tuple[int, bt.Synapse]:
-        uid: int = metagraph.hotkeys.index(inbound_axon.hotkey)
+        uid: Optional[int] = index.get_uid(inbound_axon.hotkey)
+        if uid is None:
+            raise ValueError(f"{inbound_axon.hotkey} is not in metagraph")
 
         # NOTE: Anything except `forward` here causes
         #       weird impure race-conditions.
@@ -170,19 +208,100 @@ async def query_axons_async(
         #       Please use `forward` for now
         to_return: List[bt.Synapse] = await dendrite.forward(
             synapse=synapse,
-            timeout=get_config().alchemy.query_timeout,
+            timeout=timeout,
             axons=[inbound_axon],
         )
 
         return uid, to_return[0]
 
     # Create tasks for all axons
-    tasks = [asyncio.create_task(do_call(axon)) for axon in axons]
+    tasks: Dict[asyncio.Task, bt.AxonInfo] = {
+        asyncio.create_task(do_call(axon)): axon for axon in axons
+    }
+
+    if quorum <= 0:
+        # Use asyncio.as_completed to yield results as they complete
+        for future in asyncio.as_completed(tasks):
+            uid, result = await future
+            yield uid, result
+
+        return
+
+    deadline: Optional[float] = None
+    if soft_timeout is not None:
+        deadline = time.perf_counter() + soft_timeout
+
+    successes: int = 0
+    pending: Set[asyncio.Task] = set(tasks)
+    try:
+        while pending and successes < quorum:
+            remaining: Optional[float] = None
+            if deadline is not None:
+                remaining = max(deadline - time.perf_counter(), 0)
+
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=remaining,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                logger.info(f"Soft deadline reached, {len(pending)} left")
+                break
+
+            for future in done:
+                uid, result = future.result()
+                successes += int(result.is_success)
+                yield uid, result
+
+    finally:
+        # Stragglers don't hold up the step
+        for future in pending:
+            future.cancel()
+
+    await asyncio.gather(*pending, return_exceptions=True)
+
+    for future, axon in tasks.items():
+        if future in pending:
+            yield index.get_uid(axon.hotkey), cut_off_response(synapse, axon)
+
+
+def get_query_timeout(
+    validator: "StableValidator",
+    axons: List[AxonInfo],
+) -> float:
+    config = get_config()
+    if not config.alchemy.adaptive_timeout:
+        return config.alchemy.query_timeout
+
+    # The static timeout is the ceiling
+    timeout: float = validator.query_latency.timeout_for(
+        [axon.hotkey for axon in axons],
+        q=config.alchemy.adaptive_timeout_quantile,
+        margin=config.alchemy.adaptive_timeout_margin,
+        min_timeout=ADAPTIVE_QUERY_TIMEOUT_MIN,
+        max_timeout=config.alchemy.query_timeout,
+    )
+    logger.info(f"Query timeout for this step: {timeout:.2f}s")
+    return timeout
 
-    # Use asyncio.as_completed to yield results as they complete
-    for future in asyncio.as_completed(tasks):
-        uid, result = await future
-        yield uid, result
+
+def record_query_latency(
+    latency: LatencyTracker,
+    response: bt.Synapse,
+) -> None:
+    hotkey: Optional[str] = response.axon.hotkey
+    # Miners cut off by the quorum were not necessarily slow
+    if not hotkey or response.dendrite.status_message == CUT_OFF_MESSAGE:
+        return
+
+    if not response.is_success:
+        latency.record_failure(hotkey)
+        return
+
+    try:
+        latency.record(hotkey, float(response.dendrite.process_time))
+    except (TypeError, ValueError):
+        pass
 
 
 async def query_axons_and_process_responses(
@@ -192,12 +311,22 @@ async def query_axons_and_process_responses(
     synapse: bt.Synapse,
 ) -> List[bt.Synapse]:
     """Request image generation from axons"""
+    config = get_config()
+
     responses = []
     async for uid, response in query_axons_async(
         validator.dendrite,
         axons,
         synapse,
+        quorum=config.alchemy.query_quorum,
+        soft_timeout=config.alchemy.query_soft_timeout,
+        timeout=get_query_timeout(validator, axons),
     ):
+        if response.is_timeout:
+            validator.stats.timeouts += 1
+
+        record_query_latency(validator.query_latency, response)
+
         masked_rewards: ScoringResults = await apply_masking_functions(
             validator.model_type,
             synapse,
@@ -228,24 +357,13 @@ async def query_axons_and_process_responses(
 
 def log_query_to_history(validator: "StableValidator", uids: torch.Tensor):
     try:
-        for uid in uids:
-            validator.miner_query_history_duration[
-                validator.metagraph.axons[uid].hotkey
-            ] = time.perf_counter()
-        for uid in uids:
-            validator.miner_query_history_count[
-                validator.metagraph.axons[uid].hotkey
-            ] += 1
+        validator.query_history.record(uids.tolist())
     except Exception as e:
         logger.error(
             f"Failed to log miner counts and histories due to the following error: {e}"
         )
 
-    logger.info(
-        f"Miner Counts -> Max: {max(validator.miner_query_history_count.values()):.2f} "
-        + f"| Min: {min(validator.miner_query_history_count.values()):.2f} "
-        + f"| Mean: {sum(validator.miner_query_history_count.values()) / len(validator.miner_query_history_count.values()):.2f}",
-    )
+    validator.query_history.log()
 
 
 def log_responses(responses: List[ImageGeneration], prompt: str):
@@ -334,6 +452,8 @@ async def create_batch_for_upload(
     if not blacklist_scores:
         return None
 
+    index: MetagraphIndex = get_metagraph_index(metagraph)
+
     # Update batches to be sent to the human validation platform
     # if batch_id not in validator.batches.keys():
     return Batch(
@@ -342,8 +462,8 @@ async def create_batch_for_upload(
         batch_id=batch_id,
         should_drop_entries=should_drop_entries,
         validator_hotkey=str(validator_wallet.hotkey.ss58_address),
-        miner_hotkeys=[metagraph.hotkeys[uid] for uid in uids],
-        miner_coldkeys=[metagraph.coldkeys[uid] for uid in uids],
+        miner_hotkeys=[index.hotkeys[uid] for uid in uids.tolist()],
+        miner_coldkeys=[index.coldkeys[uid] for uid in uids.tolist()],
         # Scores
         nsfw_scores=nsfw_scores.scores[uids].tolist(),
         blacklist_scores=blacklist_scores.scores[uids].tolist(),
@@ -371,14 +491,18 @@ def display_run_info(stats: Stats, task_type: str, prompt: str):
 
 
 def get_uids(responses: List[bt.Synapse]) -> torch.Tensor:
-    metagraph: bt.metagraph = get_metagraph()
+    index: MetagraphIndex = get_metagraph_index(get_metagraph())
+
+    uids: List[Optional[int]] = [
+        #
+        index.get_uid(response.axon.hotkey)
+        for response in responses
+    ]
+    if None in uids:
+        raise ValueError("Response from a hotkey that is not in metagraph")
 
     return torch.tensor(
-        [
-            #
-            metagraph.hotkeys.index(response.axon.hotkey)
-            for response in responses
-        ],
+        uids,
         dtype=torch.long,
     ).to(get_device())
 
@@ -391,127 +515,132 @@ async def run_step(
     model_type: str,
     stats: Stats,
 ):
-    # Get Arguments
-    prompt = task.prompt
-    task_type = task.task_type
-
-    # Output some information about run
-    display_run_info(stats, task_type, prompt)
-
-    # Set seed to -1 so miners will use a random seed by default
-    task_type_for_miner = task_type.lower()
-    synapse = ImageGeneration(
-        prompt=prompt,
-        negative_prompt=task.negative_prompt,
-        generation_type=task_type_for_miner,
-        prompt_image=task.images,
-        seed=task.seed,
-        guidance_scale=task.guidance_scale,
-        steps=task.steps,
-        num_images_per_prompt=1,
-        width=task.width,
-        height=task.height,
-        model_type=model_type,
-    )
+    # Every scoring model (and the upload batches) share one decoded
+    # copy of each response image, dropped once the step is over
+    with decoded_image_cache():
+        # Get Arguments
+        prompt = task.prompt
+        task_type = task.task_type
+
+        # Output some information about run
+        display_run_info(stats, task_type, prompt)
+
+        # Set seed to -1 so miners will use a random seed by default
+        task_type_for_miner = task_type.lower()
+        synapse = ImageGeneration(
+            prompt=prompt,
+            negative_prompt=task.negative_prompt,
+            generation_type=task_type_for_miner,
+            prompt_image=task.images,
+            seed=task.seed,
+            guidance_scale=task.guidance_scale,
+            steps=task.steps,
+            num_images_per_prompt=1,
+            width=task.width,
+            height=task.height,
+            model_type=model_type,
+        )
 
-    responses = await query_axons_and_process_responses(
-        validator,
-        task,
-        axons,
-        synapse,
-    )
+        responses = await query_axons_and_process_responses(
+            validator,
+            task,
+            axons,
+            synapse,
+        )
 
-    log_query_to_history(validator, uids)
+        log_query_to_history(validator, uids)
 
-    uids = get_uids(responses)
+        uids = get_uids(responses)
 
-    logger.info(
-        f"UIDs -> {' | '.join([str(uid.item()) for uid in uids])}",
-    )
+        logger.info(
+            f"UIDs -> {' | '.join([str(uid.item()) for uid in uids])}",
+        )
 
-    validator_info = validator.get_validator_info()
-    logger.info(
-        f"Stats -> Block: {validator_info['block']} "
-        f"| Stake: {validator_info['stake']:.4f} "
-        f"| Rank: {validator_info['rank']:.4f} "
-        f"| VTrust: {validator_info['vtrust']:.4f} "
-        f"| Dividends: {validator_info['dividends']:.4f} "
-        f"| Emissions: {validator_info['emissions']:.4f}",
-    )
+        validator_info = validator.get_validator_info()
+        logger.info(
+            f"Stats -> Block: {validator_info['block']} "
+            f"| Stake: {validator_info['stake']:.4f} "
+            f"| Rank: {validator_info['rank']:.4f} "
+            f"| VTrust: {validator_info['vtrust']:.4f} "
+            f"| Dividends: {validator_info['dividends']:.4f} "
+            f"| Emissions: {validator_info['emissions']:.4f}",
+        )
 
-    stats.total_requests += 1
+        stats.total_requests += 1
 
-    start_time = time.time()
+        start_time = time.time()
 
-    # Log the results for monitoring purposes.
-    if get_config().DEBUG:
-        log_responses(responses, prompt)
+        # Log the results for monitoring purposes.
+        if get_config().DEBUG:
+            log_responses(responses, prompt)
 
-    # Calculate rewards
-    scoring_results: ScoringResults = await get_scoring_results(
-        validator.model_type,
-        synapse,
-        responses,
-    )
+        # Calculate rewards
+        scoring_results: ScoringResults = await get_scoring_results(
+            validator.model_type,
+            synapse,
+            responses,
+        )
 
-    # TODO: Check and see if miners are getting dropped scores
-    #       because the is-alive filter is too strict or broken
-    # rewards_tensor_adjusted = filter_rewards(
-    #     validator.isalive_dict,
-    #     validator.isalive_threshold,
-    #     # No need for scattering, directly use the rewards
-    #     scoring_results.combined_scores,
-    # )
-
-    # Update moving averages
-    validator.moving_average_scores = await update_moving_averages(
-        validator.moving_average_scores,
-        scoring_results,
-        hotkey_blacklist=validator.hotkey_blacklist,
-        coldkey_blacklist=validator.coldkey_blacklist,
-    )
+        # TODO: Check and see if miners are getting dropped scores
+        #       because the is-alive filter is too strict or broken
+        # rewards_tensor_adjusted = filter_rewards(
+        #     validator.isalive_dict,
+        #     validator.isalive_threshold,
+        #     # No need for scattering, directly use the rewards
+        #     scoring_results.combined_scores,
+        # )
+
+        # Update moving averages, one step at a time
+        # since other steps may be running concurrently
+        async with validator.moving_average_lock:
+            validator.moving_average_scores = await update_moving_averages(
+                validator.moving_average_scores,
+                scoring_results,
+                hotkey_blacklist=validator.hotkey_blacklist,
+                coldkey_blacklist=validator.coldkey_blacklist,
+            )
 
-    # Create event for logging
-    event: Dict = {}
-    rewards_list = scoring_results.combined_scores[uids].tolist()
+        # Create event for logging
+        event: Dict = {}
+        rewards_list = scoring_results.combined_scores[uids].tolist()
 
-    for reward_score in scoring_results.scores:
-        event[reward_score.type] = reward_score.scores[uids]
+        for reward_score in scoring_results.scores:
+            event[reward_score.type] = reward_score.scores[uids]
 
-    try:
-        # Log the step event.
-        event.update(
-            {
-                "task_type": task_type,
-                "block": ttl_get_block(),
-                "step_length": time.time() - start_time,
-                "prompt": prompt if task_type == "TEXT_TO_IMAGE" else None,
-                "uids": uids,
-                "hotkeys": [response.axon.hotkey for response in responses],
-                "images": [
-                    (
-                        response.images[0]
-                        if (response.images != [])
-                        else empty_image_tensor()
-                    )
-                    for response, reward in zip(responses, rewards_list)
-                ],
-                "rewards": rewards_list,
-                "model_type": model_type,
-            }
-        )
-        event.update(validator_info)
+        try:
+            # Log the step event.
+            event.update(
+                {
+                    "task_type": task_type,
+                    "block": ttl_get_block(),
+                    "step_length": time.time() - start_time,
+                    "prompt": prompt if task_type == "TEXT_TO_IMAGE" else None,
+                    "uids": uids,
+                    "hotkeys": [response.axon.hotkey for response in responses],
+                    "images": [
+                        (
+                            response.images[0]
+                            if (response.images != [])
+                            else empty_image_tensor()
+                        )
+                        for response, reward in zip(responses, rewards_list)
+                    ],
+                    "rewards": rewards_list,
+                    "model_type": model_type,
+                }
+            )
+            event.update(validator_info)
 
-    # Should stop & restart the validator
-    except BittensorBrokenPipe:
-        raise
+        # Should stop & restart the validator
+        except BittensorBrokenPipe:
+            raise
 
-    except Exception as err:
-        logger.error(f"Error updating event dict: {err}")
+        except Exception as err:
+            logger.error(f"Error updating event dict: {err}")
 
-    try:
-        log_event(event)
-    except Exception as e:
-        logger.error(f"Failed while logging event: {e}")
+        try:
+            log_event(event)
+        except Exception as e:
+            logger.error(f"Failed while logging event: {e}")
 
-    return event
+        return event
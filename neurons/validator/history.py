@@ -0,0 +1,117 @@
+import time
+from typing import List
+
+import numpy as np
+from loguru import logger
+
+from neurons.constants import MAX_PROBE_FAILURES
+
+
+class MinerQueryHistory:
+    """
+    How often and when every miner was queried, indexed by UID.
+
+    Selection works in epochs: miners not queried yet in the current
+    epoch come first, least recently queried first, so every candidate
+    is covered in as few steps as possible. The epoch restarts once all
+    candidates of a selection have been queried.
+    """
+
+    def __init__(self, hotkeys: List[str]):
+        self.hotkeys: List[str] = []
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.last_queried = np.zeros(0, dtype=np.float64)
+        self.fail_counts = np.zeros(0, dtype=np.int64)
+        self.queried_in_epoch = np.zeros(0, dtype=bool)
+
+        self.epoch: int = 0
+        self.epoch_steps: int = 0
+
+        self.sync(hotkeys)
+
+    def sync(self, hotkeys: List[str]) -> None:
+        """Follow the metagraph, forgetting miners whose hotkey changed"""
+        n: int = len(hotkeys)
+        previous: int = len(self.hotkeys)
+
+        if n > previous:
+            self.counts = np.resize(self.counts, n)
+            self.last_queried = np.resize(self.last_queried, n)
+            self.fail_counts = np.resize(self.fail_counts, n)
+            self.queried_in_epoch = np.resize(self.queried_in_epoch, n)
+            self.reset(np.arange(previous, n))
+
+        replaced = [
+            uid
+            for uid, (old, new) in enumerate(zip(self.hotkeys, hotkeys))
+            if old != new
+        ]
+        self.reset(np.array(replaced, dtype=np.int64))
+
+        self.hotkeys = list(hotkeys)
+
+    def reset(self, uids: np.ndarray) -> None:
+        self.counts[uids] = 0
+        self.last_queried[uids] = 0.0
+        self.fail_counts[uids] = 0
+        self.queried_in_epoch[uids] = False
+
+    def order(self, uids: List[int]) -> List[int]:
+        """`uids`, the ones that should be queried next first"""
+        if not uids:
+            return []
+
+        candidates = np.array(uids, dtype=np.int64)
+        candidates = candidates[candidates < len(self.hotkeys)]
+
+        if self.queried_in_epoch[candidates].all():
+            logger.info(
+                f"Queried all candidate miners in {self.epoch_steps} steps,"
+                + f" starting query epoch {self.epoch + 1}"
+            )
+            self.queried_in_epoch[:] = False
+            self.epoch += 1
+            self.epoch_steps = 0
+
+        # np.lexsort sorts by the last key first, ties are random
+        order = np.lexsort(
+            (
+                np.random.random(candidates.size),
+                self.last_queried[candidates],
+                self.queried_in_epoch[candidates],
+            )
+        )
+        return candidates[order].tolist()
+
+    def record(self, uids: List[int]) -> None:
+        uids = [uid for uid in uids if uid < len(self.hotkeys)]
+
+        self.counts[uids] += 1
+        self.last_queried[uids] = time.time()
+        self.queried_in_epoch[uids] = True
+        self.epoch_steps += 1
+
+    def record_failure(self, uid: int) -> None:
+        if uid >= len(self.hotkeys):
+            return
+
+        self.fail_counts[uid] += 1
+
+        # Don't keep probing a miner that doesn't respond
+        if self.fail_counts[uid] >= MAX_PROBE_FAILURES:
+            self.last_queried[uid] = time.time()
+            self.counts[uid] = int(self.counts.mean())
+            self.queried_in_epoch[uid] = True
+
+    def log(self) -> None:
+        if not self.hotkeys:
+            return
+
+        logger.info(
+            f"Miner Counts -> Max: {self.counts.max():.2f} "
+            + f"| Min: {self.counts.min():.2f} "
+            + f"| Mean: {self.counts.mean():.2f}"
+            + f" | Query epoch {self.epoch}:"
+            + f" {int(self.queried_in_epoch.sum())} queried"
+            + f" in {self.epoch_steps} steps",
+        )
@@ -0,0 +1,96 @@
+import time
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+
+class LatencyStats(BaseModel):
+    ewma: float = 0.0
+    successes: int = 0
+    failures: int = 0
+    last_success: float = 0.0
+
+
+class LatencyTracker:
+    """
+    Response times of every miner for one kind of query.
+
+    Keeps an EWMA and the last `window` successful response times per
+    hotkey, from which timeouts are derived. Failed queries add no
+    sample: a dead miner can't raise the timeout of the others.
+    """
+
+    def __init__(
+        self,
+        window: int = 32,
+        alpha: float = 0.1,
+        min_samples: int = 8,
+    ):
+        self.window = window
+        self.alpha = alpha
+        self.min_samples = min_samples
+
+        self.stats: Dict[str, LatencyStats] = {}
+        # Ring buffer of the latest response times, NaN while unfilled
+        self.samples: Dict[str, np.ndarray] = {}
+
+    def get(self, hotkey: str) -> LatencyStats:
+        stats: Optional[LatencyStats] = self.stats.get(hotkey)
+        if stats is None:
+            stats = LatencyStats()
+            self.stats[hotkey] = stats
+            self.samples[hotkey] = np.full(self.window, np.nan)
+
+        return stats
+
+    def record(self, hotkey: str, latency: float) -> None:
+        stats: LatencyStats = self.get(hotkey)
+
+        if stats.successes == 0:
+            stats.ewma = latency
+        else:
+            stats.ewma += self.alpha * (latency - stats.ewma)
+
+        self.samples[hotkey][stats.successes % self.window] = latency
+        stats.successes += 1
+        stats.last_success = time.time()
+
+    def record_failure(self, hotkey: str) -> None:
+        self.get(hotkey).failures += 1
+
+    def quantile(self, hotkeys: Iterable[str], q: float) -> Optional[float]:
+        """Quantile of the pooled response times of `hotkeys`"""
+        pooled = [
+            self.samples[hotkey] for hotkey in hotkeys if hotkey in self.samples
+        ]
+        if not pooled:
+            return None
+
+        samples: np.ndarray = np.concatenate(pooled)
+        samples = samples[~np.isnan(samples)]
+        if samples.size < self.min_samples:
+            return None
+
+        return float(np.quantile(samples, q))
+
+    def timeout_for(
+        self,
+        hotkeys: Iterable[str],
+        q: float,
+        margin: float,
+        min_timeout: float,
+        max_timeout: float,
+    ) -> float:
+        """
+        The `q` quantile of the response times of `hotkeys`
+        plus a relative `margin`, within the given bounds.
+
+        Falls back to `max_timeout` while there are too few samples.
+        """
+        latency: Optional[float] = self.quantile(hotkeys, q)
+        if latency is None:
+            return max_timeout
+
+        timeout: float = latency * (1 + margin)
+        return float(min(max(timeout, min_timeout), max_timeout))
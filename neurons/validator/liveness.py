@@ -0,0 +1,176 @@
+import asyncio
+import random
+import time
+import traceback
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set
+
+import sentry_sdk
+from loguru import logger
+from pydantic import BaseModel
+
+from neurons.validator.utils import get_candidate_uids
+
+if TYPE_CHECKING:
+    from neurons.validator.validator import StableValidator
+
+
+class LivenessEntry(BaseModel):
+    alive: bool
+    latency: Optional[float] = None
+    checked_at: float
+
+
+class LivenessProber:
+    """
+    Probes every candidate miner with IsAlive in the background.
+
+    Keeps the latest result of every probe, and the alive UIDs in a
+    list (with the position of each) so they can be sampled from and
+    updated in O(1). Results older than `ttl` are not trusted, and until
+    a full sweep finished within `ttl` UIDs are probed on the spot.
+    """
+
+    def __init__(
+        self,
+        validator: "StableValidator",
+        interval: float,
+        ttl: float,
+        concurrency: int,
+    ):
+        self.validator = validator
+        self.interval = interval
+        self.ttl = ttl
+        self.concurrency = max(concurrency, 1)
+
+        self.table: Dict[int, LivenessEntry] = {}
+        self.alive_uids: List[int] = []
+        self.alive_positions: Dict[int, int] = {}
+
+        # When the last sweep over every candidate finished
+        self.swept_at: float = 0.0
+        self.task: Optional[asyncio.Task] = None
+
+    def record(
+        self,
+        uid: int,
+        alive: bool,
+        latency: Optional[float] = None,
+    ) -> None:
+        self.table[uid] = LivenessEntry(
+            alive=alive,
+            latency=latency,
+            checked_at=time.time(),
+        )
+
+        if alive:
+            if uid not in self.alive_positions:
+                self.alive_positions[uid] = len(self.alive_uids)
+                self.alive_uids.append(uid)
+        else:
+            self.discard(uid)
+
+    def discard(self, uid: int) -> None:
+        position: Optional[int] = self.alive_positions.pop(uid, None)
+        if position is None:
+            return
+
+        # Swap with the last one, so removing is O(1) too
+        last: int = self.alive_uids.pop()
+        if last != uid:
+            self.alive_uids[position] = last
+            self.alive_positions[last] = position
+
+    def forget(self, uid: int) -> None:
+        self.table.pop(uid, None)
+        self.discard(uid)
+
+    def is_fresh(self) -> bool:
+        return time.time() - self.swept_at <= self.ttl
+
+    def is_alive(self, uid: int, now: float) -> bool:
+        entry: Optional[LivenessEntry] = self.table.get(uid)
+        return (
+            entry is not None
+            and entry.alive
+            and now - entry.checked_at <= self.ttl
+        )
+
+    def sample(
+        self,
+        k: int,
+        exclude: Optional[List[int]] = None,
+        is_candidate: Callable[[int], bool] = lambda _uid: True,
+    ) -> List[int]:
+        """Up to `k` random UIDs alive when last probed"""
+        excluded: Set[int] = set(exclude or [])
+        now: float = time.time()
+
+        def is_eligible(uid: int) -> bool:
+            return (
+                uid not in excluded
+                and self.is_alive(uid, now)
+                and is_candidate(uid)
+            )
+
+        # A few spare ones, in case some are excluded
+        spare: int = min(len(self.alive_uids), k + len(excluded))
+        sampled: List[int] = random.sample(self.alive_uids, spare)
+        uids: List[int] = [uid for uid in sampled if is_eligible(uid)][:k]
+
+        if len(uids) < k and spare < len(self.alive_uids):
+            # Too many stale or blacklisted ones, look at all of them
+            seen: Set[int] = set(sampled)
+            rest: List[int] = [
+                uid for uid in self.alive_uids if uid not in seen
+            ]
+            random.shuffle(rest)
+            uids += [uid for uid in rest if is_eligible(uid)][: k - len(uids)]
+
+        return uids
+
+    async def sweep(self, uids: List[int]) -> None:
+        """Probe `uids`, forgetting every UID not in there"""
+        t0: float = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def probe(uid: int) -> None:
+            async with semaphore:
+                # Records the result through `record`
+                await self.validator.check_uid(uid, [])
+
+        await asyncio.gather(*(probe(uid) for uid in uids))
+
+        probed: Set[int] = set(uids)
+        for uid in [uid for uid in self.table if uid not in probed]:
+            self.forget(uid)
+
+        self.swept_at = time.time()
+        logger.info(
+            f"Probed {len(uids)} miners in {time.perf_counter() - t0:.2f}s,"
+            + f" {len(self.alive_uids)} alive"
+        )
+
+    async def run(self) -> None:
+        while not self.validator.should_quit.is_set():
+            try:
+                await self.sweep(get_candidate_uids(self.validator))
+            except Exception as e:
+                logger.error(traceback.format_exc())
+                sentry_sdk.capture_exception(e)
+
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self.interval <= 0:
+            return
+
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self.task is None:
+            return
+
+        self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+        self.task = None
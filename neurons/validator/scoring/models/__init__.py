@@ -1,10 +1,14 @@
+import os
 from typing import List
 
 import torch
 import bittensor as bt
 
+from neurons import constants
 from neurons.protocol import ModelType
 
+from neurons.validator.config import get_config
+
 from neurons.validator.scoring.models.empty import EmptyScoreRewardModel
 
 from neurons.validator.scoring.models.masks.nsfw import NSFWRewardModel
@@ -61,6 +65,19 @@ def should_check_duplicates(
     return len(responses) > 1
 
 
+def get_duplicate_filter() -> DuplicateFilter:
+    # Tests score the same images step after step on purpose
+    if constants.IS_TEST:
+        return DuplicateFilter()
+
+    config = get_config()
+    return DuplicateFilter(
+        hash_index_path=os.path.join(config.alchemy.full_path, "phash_index"),
+        hash_index_size=config.alchemy.phash_index_size,
+        hash_index_max_age=config.alchemy.phash_index_max_age,
+    )
+
+
 def get_masking_models() -> ModelStorage:
     global MASKING_MODELS
     if not MASKING_MODELS:
@@ -75,7 +92,7 @@ def get_masking_models() -> ModelStorage:
             ),
             RewardModelType.DUPLICATE: PackedRewardModel(
                 weight=1.0,
-                model=DuplicateFilter(),
+                model=get_duplicate_filter(),
                 should_apply=should_check_duplicates,
             ),
         }
@@ -1,12 +1,13 @@
 import inspect
 from abc import abstractmethod
-from typing import Callable, List, TYPE_CHECKING
+from typing import List, Tuple, TYPE_CHECKING
 
 import torch
 import bittensor as bt
 from loguru import logger
 
 
+from neurons.utils.metagraph import MetagraphIndex, get_metagraph_index
 from neurons.validator.config import get_device, get_metagraph
 
 if TYPE_CHECKING:
@@ -43,38 +44,96 @@ class BaseRewardModel:
     def ones(self) -> torch.Tensor:
         return torch.ones(get_metagraph().n).to(get_device())
 
-    async def build_rewards_tensor(
+    def get_metagraph_index(self) -> MetagraphIndex:
+        return get_metagraph_index(get_metagraph())
+
+    def get_valid_responses(
         self,
-        method: Callable,
-        _synapse: bt.Synapse,
         responses: List[bt.Synapse],
-    ) -> torch.Tensor:
-        if not callable(method):
-            raise NotImplementedError(f"{method.__name__} is not callable!")
+    ) -> Tuple[List[int], List[bt.Synapse]]:
+        """
+        Find the UID of every response we are able to score.
 
-        rewards = self.zeros()
+        Responses from hotkeys that are not (or no longer)
+        in the metagraph are skipped.
+        """
+        index: MetagraphIndex = self.get_metagraph_index()
+
+        uids: List[int] = []
+        valid_responses: List[bt.Synapse] = []
         for response in responses:
-            score = method(response)
             hotkey = response.axon.hotkey
-            try:
-                index = get_metagraph().hotkeys.index(hotkey)
-                rewards[index] = score
-            except ValueError:
+            uid = index.get_uid(hotkey)
+            if uid is None:
                 logger.error(f"Hotkey {hotkey} not found in metagraph")
+                continue
+
+            uids.append(uid)
+            valid_responses.append(response)
+
+        return uids, valid_responses
+
+    def scatter_rewards(
+        self,
+        uids: List[int],
+        scores: torch.Tensor,
+    ) -> torch.Tensor:
+        """
+        Scatter one score per UID into a metagraph sized rewards tensor.
+        """
+        rewards = self.zeros()
+        if not uids:
+            return rewards
+
+        rewards[torch.tensor(uids, dtype=torch.long)] = torch.as_tensor(
+            scores,
+            dtype=rewards.dtype,
+        ).to(rewards.device)
 
         return rewards
 
+    async def get_rewards_batch(
+        self,
+        _synapse: bt.Synapse,
+        responses: List[bt.Synapse],
+    ) -> torch.Tensor:
+        """
+        Score every valid response of a step at once.
+
+        Must return one score per response, in the same order
+        as `responses`. Models able to batch their work
+        (i.e. one forward pass per step) should override this.
+
+        By default we fall back to scoring each response
+        on its own using `get_reward`.
+        """
+        return torch.tensor(
+            [self.get_reward(response) for response in responses],
+            dtype=torch.float32,
+        )
+
     async def get_rewards(
         self,
         synapse: bt.Synapse,
         responses: List[bt.Synapse],
     ) -> torch.Tensor:
-        return await self.build_rewards_tensor(
-            self.get_reward,
+        uids, valid_responses = self.get_valid_responses(responses)
+        if not valid_responses:
+            return self.zeros()
+
+        scores: torch.Tensor = await self.get_rewards_batch(
             synapse,
-            responses,
+            valid_responses,
         )
 
+        if len(scores) != len(valid_responses):
+            raise ValueError(
+                f"{self.name} returned {len(scores)} scores"
+                + f" for {len(valid_responses)} responses"
+            )
+
+        return self.scatter_rewards(uids, scores)
+
     def get_reward(self, _response: bt.Synapse) -> float:
         return 0.0
 
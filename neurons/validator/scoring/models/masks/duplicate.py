@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional, Tuple
 import torch
 import numpy as np
 import imagehash
@@ -6,9 +6,14 @@ from PIL import Image
 import bittensor as bt
 from loguru import logger
 
-from neurons.utils.image import synapse_to_tensors
+from neurons.utils.image import synapse_to_uint8_tensors
+from neurons.utils.metagraph import MetagraphIndex, get_metagraph_index
 from neurons.validator.config import get_metagraph
 from neurons.validator.scoring.models.base import BaseRewardModel
+from neurons.validator.scoring.models.masks.hash_index import (
+    PerceptualHashIndex,
+    hamming_distances,
+)
 from neurons.validator.scoring.models.types import RewardModelType
 
 
@@ -17,22 +22,122 @@ class DuplicateFilter(BaseRewardModel):
     def name(self) -> RewardModelType:
         return RewardModelType.DUPLICATE
 
-    def __init__(self, hash_size: int = 8, threshold_ratio: float = 0.1):
+    def __init__(
+        self,
+        hash_size: int = 8,
+        threshold_ratio: float = 0.1,
+        hash_index_path: Optional[str] = None,
+        hash_index_size: int = 0,
+        hash_index_max_age: float = 0.0,
+    ):
         super().__init__()
         self.hash_size = hash_size
         self.threshold_ratio = threshold_ratio
 
+        # Hashes from previous steps, used to catch replayed images
+        self.hash_index: Optional[PerceptualHashIndex] = None
+        if hash_index_path and hash_index_size > 0:
+            self.hash_index = PerceptualHashIndex(
+                path=hash_index_path,
+                hash_bits=hash_size * hash_size,
+                max_distance=self.max_diff,
+                capacity=hash_index_size,
+                max_age=hash_index_max_age,
+            )
+
+    @property
+    def max_diff(self) -> int:
+        return int(self.hash_size * self.hash_size * self.threshold_ratio)
+
+    @property
+    def hash_words(self) -> int:
+        return -(-self.hash_size * self.hash_size // 64)
+
     def compute_phash(self, image: torch.Tensor) -> imagehash.ImageHash:
-        img = Image.fromarray(
-            (image.permute(1, 2, 0).cpu().numpy() * 255).astype(np.uint8)
-        )
+        if image.is_floating_point():
+            image = (image * 255).to(torch.uint8)
+
+        img = Image.fromarray(image.permute(1, 2, 0).cpu().numpy())
         return imagehash.phash(img, hash_size=self.hash_size)
 
+    def pack_hash(self, image_hash: imagehash.ImageHash) -> np.ndarray:
+        bits = np.zeros(self.hash_words * 64, dtype=bool)
+        bits[: image_hash.hash.size] = image_hash.hash.flatten()
+        return np.packbits(bits).view(np.uint64)
+
     def are_images_similar(
         self, hash1: imagehash.ImageHash, hash2: imagehash.ImageHash
     ) -> bool:
-        max_diff = int(self.hash_size * self.hash_size * self.threshold_ratio)
-        return hash1 - hash2 <= max_diff
+        return hash1 - hash2 <= self.max_diff
+
+    def hash_responses(
+        self,
+        responses: List[bt.Synapse],
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Packed hashes of every response as a [responses, images, words]
+        uint64 array, plus a [responses, images] mask of the slots
+        that hold an image.
+        """
+        all_images = [synapse_to_uint8_tensors(r) for r in responses]
+        max_images = max(len(images) for images in all_images)
+
+        hashes = np.zeros(
+            (len(responses), max_images, self.hash_words),
+            dtype=np.uint64,
+        )
+        present = np.zeros((len(responses), max_images), dtype=bool)
+
+        for i, images in enumerate(all_images):
+            for k, image in enumerate(images):
+                hashes[i, k] = self.pack_hash(self.compute_phash(image))
+                present[i, k] = True
+
+        return hashes, present
+
+    def similarity_matrix(
+        self,
+        hashes: np.ndarray,
+        present: np.ndarray,
+    ) -> np.ndarray:
+        """
+        [responses, responses] matrix, True when any pair of images at
+        the same position in both responses is within max_diff.
+        """
+        distances = hamming_distances(hashes[:, None], hashes[None, :])
+        both_present = present[:, None] & present[None, :]
+        return ((distances <= self.max_diff) & both_present).any(axis=-1)
+
+    def find_replays(
+        self,
+        responses: List[bt.Synapse],
+        hashes: np.ndarray,
+        present: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Flag responses serving an image already seen in an earlier step,
+        then remember this step's hashes.
+        """
+        replayed = np.zeros(len(responses), dtype=bool)
+        rows, columns = np.nonzero(present)
+
+        for i, k in zip(rows, columns):
+            matches = self.hash_index.query(hashes[i, k])
+            if not matches:
+                continue
+
+            replayed[i] = True
+            logger.info(
+                f"{responses[i].axon.hotkey} replayed an image first seen"
+                + f" from {matches[0].hotkey} at step {matches[0].step}"
+            )
+
+        self.hash_index.add(
+            hashes[rows, columns],
+            [responses[i].axon.hotkey for i in rows],
+        )
+
+        return replayed
 
     async def get_rewards(
         self,
@@ -43,47 +148,46 @@ class DuplicateFilter(BaseRewardModel):
 
         mask = super().zeros()
 
-        valid_responses = []
-        all_hashes = []
-
-        for response in responses:
-            if not response.images:
-                continue
-
-            if any(image is None for image in response.images):
-                continue
-
-            images = synapse_to_tensors(response)
-            response_hashes = [self.compute_phash(img) for img in images]
-            all_hashes.append(response_hashes)
-            valid_responses.append(response)
+        valid_responses = [
+            response
+            for response in responses
+            if response.images
+            and not any(image is None for image in response.images)
+        ]
 
         if not valid_responses:
             return mask
 
+        hashes, present = self.hash_responses(valid_responses)
+        similar = self.similarity_matrix(hashes, present)
+
         n = len(valid_responses)
         duplicate_mask = np.zeros(n, dtype=bool)
 
+        # Each response is paired with the first later response it
+        # matches, responses already paired are not checked again
         for i in range(n):
             if duplicate_mask[i]:
                 continue
-            for j in range(i + 1, n):
-                similar_images = sum(
-                    self.are_images_similar(hash1, hash2)
-                    for hash1, hash2 in zip(all_hashes[i], all_hashes[j])
-                )
 
-                if similar_images > 0:
-                    duplicate_mask[i] = True
-                    duplicate_mask[j] = True
-                    break
+            matches = np.flatnonzero(similar[i, i + 1 :])
+            if matches.size > 0:
+                duplicate_mask[i] = True
+                duplicate_mask[i + 1 + matches[0]] = True
+
+        if self.hash_index is not None:
+            duplicate_mask |= self.find_replays(
+                valid_responses,
+                hashes,
+                present,
+            )
 
-        metagraph = get_metagraph()
+        index: MetagraphIndex = get_metagraph_index(get_metagraph())
 
         for idx, is_duplicate in enumerate(duplicate_mask):
             if is_duplicate:
-                hotkey = valid_responses[idx].axon.hotkey
-                if hotkey in metagraph.hotkeys:
-                    mask[metagraph.hotkeys.index(hotkey)] = 1.0
+                uid = index.get_uid(valid_responses[idx].axon.hotkey)
+                if uid is not None:
+                    mask[uid] = 1.0
 
         return mask
@@ -0,0 +1,290 @@
+import math
+import os
+import time
+from itertools import combinations
+from typing import Dict, List, Tuple
+
+import numpy as np
+from loguru import logger
+from numpy.lib.format import open_memmap
+from pydantic import BaseModel
+
+# Number of set bits for every possible byte value
+POPCOUNT_TABLE = np.array(
+    [bin(value).count("1") for value in range(256)],
+    dtype=np.uint8,
+)
+
+# ss58 addresses are 48 characters long
+HOTKEY_LENGTH = 64
+
+
+def hamming_distances(hashes_a: np.ndarray, hashes_b: np.ndarray) -> np.ndarray:
+    """
+    Hamming distance between packed hashes, broadcasting over every
+    leading axis; the last axis holds the uint64 words of each hash.
+    """
+    xor = np.bitwise_xor(hashes_a, hashes_b)
+    bit_counts = POPCOUNT_TABLE[xor.view(np.uint8)]
+    return bit_counts.sum(axis=-1, dtype=np.int64)
+
+
+def flip_masks(width: int, radius: int) -> np.ndarray:
+    """Every mask of up to `radius` set bits within `width` bits."""
+    masks = [0]
+    for count in range(1, min(radius, width) + 1):
+        for bits in combinations(range(width), count):
+            masks.append(sum(1 << bit for bit in bits))
+
+    return np.array(masks, dtype=np.uint64)
+
+
+class HashMatch(BaseModel):
+    hotkey: str
+    step: int
+    distance: int
+
+
+class HashChunk(BaseModel):
+    word: int
+    shift: int
+    width: int
+
+
+class PerceptualHashIndex:
+    """
+    Persistent store of recently seen image hashes.
+
+    Records live in a memory-mapped ring buffer on disk, so the oldest
+    hashes are overwritten once `capacity` is reached and hashes older
+    than `max_age` seconds are ignored.
+
+    Lookups use multi-index hashing: every hash is split into `m` chunks,
+    so any hash within `max_distance` bits has at least one chunk within
+    `max_distance // m` bits. Each chunk is kept as a sorted array
+    (rebuilt in bulk) plus a small dict of recent additions.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        hash_bits: int,
+        max_distance: int,
+        capacity: int,
+        max_age: float,
+    ):
+        self.path = path
+        self.hash_words = -(-hash_bits // 64)
+        self.max_distance = max_distance
+        self.capacity = capacity
+        self.max_age = max_age
+
+        # Chunks about as wide as log2(capacity) keep buckets small,
+        # never more than max_distance + 1 of them are needed, and enough
+        # of them keep the neighbours probed per chunk (radius <= 2) few
+        num_chunks = round(hash_bits / max(math.log2(capacity), 1))
+        num_chunks = min(num_chunks, max_distance + 1)
+        num_chunks = max(num_chunks, -(-(max_distance + 1) // 3), 1)
+        per_word = -(-num_chunks // self.hash_words)
+
+        self.chunks: List[HashChunk] = []
+        for word in range(self.hash_words):
+            bounds = np.linspace(0, 64, per_word + 1).astype(int)
+            self.chunks += [
+                HashChunk(word=word, shift=int(start), width=int(end - start))
+                for start, end in zip(bounds[:-1], bounds[1:])
+            ]
+
+        self.chunk_radius = max_distance // len(self.chunks)
+        self.chunk_masks: List[np.ndarray] = [
+            flip_masks(chunk.width, self.chunk_radius) for chunk in self.chunks
+        ]
+
+        self.dtype = np.dtype(
+            [
+                ("hash", np.uint64, (self.hash_words,)),
+                ("hotkey", f"S{HOTKEY_LENGTH}"),
+                ("step", np.int64),
+                ("time", np.float64),
+            ]
+        )
+
+        self.records, self.cursor = self.open()
+
+        self.sorted_keys: List[np.ndarray] = []
+        self.sorted_slots: List[np.ndarray] = []
+        self.pending: List[Dict[int, List[int]]] = []
+        self.rebuild()
+
+    @property
+    def written(self) -> int:
+        return int(self.cursor[0])
+
+    @property
+    def step(self) -> int:
+        return int(self.cursor[1])
+
+    def __len__(self) -> int:
+        return min(self.written, self.capacity)
+
+    def open(self) -> Tuple[np.ndarray, np.ndarray]:
+        os.makedirs(self.path, exist_ok=True)
+        records_path = os.path.join(self.path, "records.npy")
+        cursor_path = os.path.join(self.path, "cursor.npy")
+
+        if os.path.exists(records_path) and os.path.exists(cursor_path):
+            try:
+                records = open_memmap(records_path, mode="r+")
+                cursor = open_memmap(cursor_path, mode="r+")
+
+                if records.dtype == self.dtype and records.shape == (
+                    self.capacity,
+                ):
+                    return records, cursor
+
+                logger.warning(
+                    "Perceptual hash index layout changed, starting a new one"
+                )
+
+            except Exception as e:
+                logger.error(f"Failed to load perceptual hash index: {e}")
+
+        records = open_memmap(
+            records_path,
+            mode="w+",
+            dtype=self.dtype,
+            shape=(self.capacity,),
+        )
+        # [records written so far, steps added so far]
+        cursor = open_memmap(
+            cursor_path,
+            mode="w+",
+            dtype=np.int64,
+            shape=(2,),
+        )
+        return records, cursor
+
+    def chunk_keys(self, hashes: np.ndarray) -> np.ndarray:
+        """[N, words] hashes -> [N, chunks] uint64 chunk keys."""
+        keys = np.empty((len(hashes), len(self.chunks)), dtype=np.uint64)
+
+        for c, chunk in enumerate(self.chunks):
+            mask = np.uint64((1 << chunk.width) - 1)
+            keys[:, c] = (
+                hashes[:, chunk.word] >> np.uint64(chunk.shift)
+            ) & mask
+
+        return keys
+
+    def live_slots(self) -> np.ndarray:
+        cutoff = time.time() - self.max_age
+        slots = np.arange(len(self))
+        return slots[self.records["time"][: len(self)] >= cutoff]
+
+    def rebuild(self) -> None:
+        slots = self.live_slots()
+        keys = self.chunk_keys(self.records["hash"][slots])
+
+        self.sorted_keys = []
+        self.sorted_slots = []
+        for c in range(len(self.chunks)):
+            order = np.argsort(keys[:, c])
+            self.sorted_keys.append(keys[order, c])
+            self.sorted_slots.append(slots[order])
+
+        self.pending = [{} for _ in self.chunks]
+
+        logger.info(f"Perceptual hash index holds {len(slots)} live hashes")
+
+    def pending_count(self) -> int:
+        return sum(len(slots) for slots in self.pending[0].values())
+
+    def add(self, hashes: np.ndarray, hotkeys: List[str]) -> int:
+        """
+        Store one step worth of [N, words] hashes, one hotkey per hash.
+
+        Returns the step the hashes were stored under.
+        """
+        step = self.step
+        if len(hashes) == 0:
+            return step
+
+        now = time.time()
+        keys = self.chunk_keys(hashes)
+
+        for idx, image_hash in enumerate(hashes):
+            slot = self.written % self.capacity
+            self.records[slot] = (
+                image_hash,
+                hotkeys[idx].encode()[:HOTKEY_LENGTH],
+                step,
+                now,
+            )
+            self.cursor[0] += 1
+
+            for c, pending in enumerate(self.pending):
+                pending.setdefault(int(keys[idx, c]), []).append(slot)
+
+        self.cursor[1] += 1
+        self.records.flush()
+        self.cursor.flush()
+
+        # Fold pending additions into the sorted arrays in bulk
+        if self.pending_count() > max(4096, len(self) // 8):
+            self.rebuild()
+
+        return step
+
+    def candidates(self, keys: np.ndarray) -> np.ndarray:
+        """Slots sharing at least one chunk (within chunk_radius)."""
+        found: List[np.ndarray] = []
+        for c, key in enumerate(keys):
+            # Sorted needles make the binary searches cache friendly
+            neighbours = np.sort(key ^ self.chunk_masks[c])
+
+            sorted_keys = self.sorted_keys[c]
+            lo = np.searchsorted(sorted_keys, neighbours, side="left")
+            hi = np.searchsorted(sorted_keys, neighbours, side="right")
+
+            counts = hi - lo
+            if counts.sum() > 0:
+                # Concatenate every [lo, hi) range in one go
+                starts = np.repeat(lo - np.cumsum(counts) + counts, counts)
+                found.append(
+                    self.sorted_slots[c][starts + np.arange(counts.sum())]
+                )
+
+            pending = self.pending[c]
+            if pending:
+                for neighbour in neighbours.tolist():
+                    if neighbour in pending:
+                        found.append(np.array(pending[neighbour]))
+
+        if not found:
+            return np.empty(0, dtype=np.int64)
+
+        return np.unique(np.concatenate(found))
+
+    def query(self, image_hash: np.ndarray) -> List[HashMatch]:
+        """All stored hashes within max_distance of a [words] hash."""
+        keys = self.chunk_keys(image_hash[None])[0]
+        slots = self.candidates(keys)
+        if slots.size == 0:
+            return []
+
+        # Slots may have been overwritten or expired since being indexed,
+        # so the stored records are always checked again
+        records = self.records[slots]
+        distances = hamming_distances(records["hash"], image_hash[None])
+        matches = (distances <= self.max_distance) & (
+            records["time"] >= time.time() - self.max_age
+        )
+
+        return [
+            HashMatch(
+                hotkey=record["hotkey"].decode(),
+                step=int(record["step"]),
+                distance=int(distance),
+            )
+            for record, distance in zip(records[matches], distances[matches])
+        ]
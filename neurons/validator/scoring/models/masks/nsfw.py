@@ -1,8 +1,11 @@
+from typing import List
+
 import bittensor as bt
+import torch
 from loguru import logger
 from transformers import CLIPImageProcessor
 
-from neurons.utils.image import synapse_to_tensors
+from neurons.utils.image import synapse_to_uint8_tensors
 from neurons.safety import StableDiffusionSafetyChecker
 
 from neurons.validator.config import get_device
@@ -22,31 +25,67 @@ class NSFWRewardModel(BaseRewardModel):
         ).to(get_device())
         self.processor = CLIPImageProcessor()
 
-    def get_reward(self, response: bt.Synapse) -> float:
+    def has_images(self, response: bt.Synapse) -> bool:
         if not response.images:
-            return 1.0
+            return False
 
-        if any(image is None for image in response.images):
+        return all(image is not None for image in response.images)
+
+    def detect_nsfw(self, images: List[torch.Tensor]) -> torch.Tensor:
+        # Clip expects RGB int values in range (0, 255)
+        clip_input = self.processor(
+            images,
+            return_tensors="pt",
+        ).to(get_device())
+
+        return self.safetychecker.detect_nsfw(
+            clip_input.pixel_values.to(get_device()),
+        )
+
+    def get_reward(self, response: bt.Synapse) -> float:
+        if not self.has_images(response):
             return 1.0
 
         try:
-            # Clip expects RGB int values in range (0, 255)
-            scaled_tensors = [
-                tensor * 255 for tensor in synapse_to_tensors(response)
-            ]
-
-            clip_input = self.processor(
-                scaled_tensors,
-                return_tensors="pt",
-            ).to(get_device())
-
-            _, has_nsfw_concept = self.safetychecker.forward(
-                images=response.images,
-                clip_input=clip_input.pixel_values.to(get_device()),
+            has_nsfw_concept = self.detect_nsfw(
+                synapse_to_uint8_tensors(response)
             )
-
-            return 1.0 if any(has_nsfw_concept) else 0.0
+            return 1.0 if has_nsfw_concept.any() else 0.0
 
         except Exception as e:
             logger.error(f"Error in NSFW detection: {e}")
             return 0.0
+
+    async def get_rewards_batch(
+        self,
+        _synapse: bt.Synapse,
+        responses: List[bt.Synapse],
+    ) -> torch.Tensor:
+        # Responses without images are masked without being checked
+        rewards = torch.ones(len(responses), dtype=torch.float32)
+
+        owners: List[int] = []
+        images: List[torch.Tensor] = []
+        try:
+            for idx, response in enumerate(responses):
+                if not self.has_images(response):
+                    continue
+
+                tensors = synapse_to_uint8_tensors(response)
+                owners.extend([idx] * len(tensors))
+                images.extend(tensors)
+
+            if not images:
+                return rewards
+
+            # One CLIP pass over every image of the step
+            has_nsfw_concept = self.detect_nsfw(images).float()
+
+        except Exception as e:
+            # Isolate whichever response broke the batch
+            logger.error(f"Error in batched NSFW detection: {e}")
+            return await super().get_rewards_batch(_synapse, responses)
+
+        owner_index = torch.tensor(owners)
+        rewards[owner_index] = 0.0
+        return rewards.index_reduce_(0, owner_index, has_nsfw_concept, "amax")
@@ -1,16 +1,20 @@
-from typing import Dict, List
+import asyncio
+import time
+import traceback
+from typing import Dict, List, Optional
 
 from loguru import logger
 import bittensor as bt
 import torch
 
+from neurons.utils.metagraph import MetagraphIndex
 from neurons.validator.scoring.models.base import BaseRewardModel
 from neurons.validator.scoring.models.types import RewardModelType
 from neurons.validator.config import (
     get_backend_client,
+    get_config,
 )
 
-
 HumanVotingResults = Dict[str, Dict[str, float]]
 
 
@@ -26,6 +30,99 @@ def process_voting_scores(
     return to_return
 
 
+class VotesCache:
+    """
+    Human votes summed per hotkey, refreshed in the background.
+
+    Reads never wait for the backend, except for the very first one,
+    or when nothing refreshes the votes in the background. Unchanged
+    votes (HTTP 304) are not processed again.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+
+        self.votes: Optional[HumanVotingResults] = None
+        self.scores: Dict[str, float] = {}
+        self.refreshed_at: float = 0.0
+
+        # Scores by UID, for one state of the metagraph
+        self.uid_scores: Optional[torch.Tensor] = None
+        self.uid_scores_index: Optional[MetagraphIndex] = None
+
+        self.lock = asyncio.Lock()
+        self.task: Optional[asyncio.Task] = None
+
+    def is_stale(self) -> bool:
+        return time.time() - self.refreshed_at > self.interval
+
+    async def refresh(self) -> None:
+        votes: HumanVotingResults = await get_backend_client().get_votes()
+        self.refreshed_at = time.time()
+
+        if votes is self.votes:
+            return
+
+        self.votes = votes
+        self.scores = process_voting_scores(votes)
+        self.uid_scores = None
+
+    async def get_uid_scores(self, index: MetagraphIndex) -> torch.Tensor:
+        """Votes of every UID of `index`"""
+        must_refresh = self.votes is None or (
+            self.task is None and self.is_stale()
+        )
+        if must_refresh:
+            async with self.lock:
+                # Someone else may have refreshed meanwhile
+                if self.votes is None or self.is_stale():
+                    await self.refresh()
+
+        uid_scores: Optional[torch.Tensor] = self.uid_scores
+        if uid_scores is None or self.uid_scores_index is not index:
+            uid_scores = torch.tensor(
+                [self.scores.get(hotkey, 0.0) for hotkey in index.hotkeys],
+                dtype=torch.float32,
+            )
+            self.uid_scores = uid_scores
+            self.uid_scores_index = index
+
+        return uid_scores
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Error while getting votes: {e}")
+                logger.debug(traceback.format_exc())
+
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self.task is None:
+            return
+
+        self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+        self.task = None
+
+
+votes_cache: Optional[VotesCache] = None
+
+
+def get_votes_cache() -> VotesCache:
+    global votes_cache
+    if not votes_cache:
+        votes_cache = VotesCache(get_config().alchemy.votes_refresh_interval)
+
+    return votes_cache
+
+
 class HumanValidationRewardModel(BaseRewardModel):
     @property
     def name(self) -> RewardModelType:
@@ -33,28 +130,22 @@ class HumanValidationRewardModel(BaseRewardModel):
 
     async def get_rewards(
         self,
-        synapse: bt.Synapse,
+        _synapse: bt.Synapse,
         responses: List[bt.Synapse],
     ) -> torch.Tensor:
         logger.info("Extracting human votes...")
 
+        uids, _valid_responses = self.get_valid_responses(responses)
+        if not uids:
+            return self.zeros()
+
         try:
-            voting_scores: Dict[str, float] = process_voting_scores(
-                await get_backend_client().get_votes()
+            uid_scores: torch.Tensor = await get_votes_cache().get_uid_scores(
+                self.get_metagraph_index()
             )
 
         except Exception as e:
             logger.error(f"Error while getting votes: {e}")
-            return super().zeros()
+            return self.zeros()
 
-        def get_reward(response: bt.Synapse) -> float:
-            return voting_scores.get(
-                response.axon.hotkey,
-                0.0,
-            )
-
-        return await super().build_rewards_tensor(
-            get_reward,
-            synapse,
-            responses,
-        )
+        return self.scatter_rewards(uids, uid_scores[uids])
@@ -1,4 +1,5 @@
-from typing import List
+from collections import defaultdict
+from typing import Dict, List, Tuple
 
 from PIL.Image import Image as ImageType
 import ImageReward as RM
@@ -6,6 +7,7 @@ import bittensor as bt
 import torch
 from loguru import logger
 
+from neurons.constants import IMAGE_REWARD_BATCH_SIZE
 from neurons.utils.image import synapse_to_images
 
 from neurons.validator.config import get_device
@@ -22,16 +24,23 @@ class ImageRewardModel(BaseRewardModel):
         super().__init__()
         self.scoring_model = RM.load("ImageReward-v1.0", device=get_device())
 
-    def get_reward(self, response: bt.Synapse) -> float:
-        with torch.no_grad():
-            try:
-                images: List[ImageType] = synapse_to_images(response)
+    def get_images(self, response: bt.Synapse) -> List[ImageType]:
+        try:
+            images: List[ImageType] = synapse_to_images(response)
+
+            if not images:
+                raise ValueError("No images")
 
-                if not images:
-                    raise ValueError("No images")
+        except Exception:
+            logger.error("ImageReward score is 0. No image in response.")
+            return []
 
-            except Exception:
-                logger.error("ImageReward score is 0. No image in response.")
+        return images
+
+    def get_reward(self, response: bt.Synapse) -> float:
+        with torch.no_grad():
+            images: List[ImageType] = self.get_images(response)
+            if not images:
                 return 0.0
 
             _, scores = self.scoring_model.inference_rank(
@@ -43,3 +52,97 @@ class ImageRewardModel(BaseRewardModel):
             mean_image_score = torch.mean(image_scores)
 
             return mean_image_score.item()
+
+    def can_batch(self) -> bool:
+        # Batching needs the BLIP internals of the real ImageReward model,
+        # anything else only offers inference_rank
+        return all(
+            hasattr(self.scoring_model, attribute)
+            for attribute in ["blip", "preprocess", "mlp", "mean", "std"]
+        )
+
+    def score_images(
+        self,
+        prompt: str,
+        images: List[ImageType],
+    ) -> torch.Tensor:
+        """
+        Score images against a single prompt in bounded batches.
+
+        This mirrors ImageReward's inference_rank, but the prompt is
+        tokenized once and the images go through the model
+        IMAGE_REWARD_BATCH_SIZE at a time instead of one by one.
+        """
+        model = self.scoring_model
+
+        text_input = model.blip.tokenizer(
+            prompt,
+            padding="max_length",
+            truncation=True,
+            max_length=35,
+            return_tensors="pt",
+        ).to(model.device)
+
+        scores: List[torch.Tensor] = []
+        for start in range(0, len(images), IMAGE_REWARD_BATCH_SIZE):
+            chunk = images[start : start + IMAGE_REWARD_BATCH_SIZE]
+
+            pixels = torch.stack(
+                [model.preprocess(image) for image in chunk]
+            ).to(model.device)
+            image_embeds = model.blip.visual_encoder(pixels)
+
+            image_atts = torch.ones(
+                image_embeds.size()[:-1],
+                dtype=torch.long,
+            ).to(model.device)
+
+            text_output = model.blip.text_encoder(
+                text_input.input_ids.expand(len(chunk), -1),
+                attention_mask=text_input.attention_mask.expand(len(chunk), -1),
+                encoder_hidden_states=image_embeds,
+                encoder_attention_mask=image_atts,
+                return_dict=True,
+            )
+
+            txt_features = text_output.last_hidden_state[:, 0, :].float()
+            rewards = model.mlp(txt_features).view(-1)
+            scores.append((rewards - model.mean) / model.std)
+
+        return torch.cat(scores).cpu()
+
+    async def get_rewards_batch(
+        self,
+        _synapse: bt.Synapse,
+        responses: List[bt.Synapse],
+    ) -> torch.Tensor:
+        if not self.can_batch():
+            return await super().get_rewards_batch(_synapse, responses)
+
+        # Responses normally share one prompt,
+        # group by it so every prompt is only encoded once
+        by_prompt: Dict[str, List[Tuple[int, ImageType]]] = defaultdict(list)
+        for idx, response in enumerate(responses):
+            for image in self.get_images(response):
+                by_prompt[response.prompt].append((idx, image))
+
+        totals = torch.zeros(len(responses), dtype=torch.float32)
+        counts = torch.zeros(len(responses), dtype=torch.float32)
+
+        with torch.no_grad():
+            for prompt, entries in by_prompt.items():
+                indices = torch.tensor([idx for idx, _ in entries])
+                scores = self.score_images(
+                    prompt,
+                    [image for _, image in entries],
+                )
+
+                totals.index_add_(0, indices, scores.float())
+                counts.index_add_(0, indices, torch.ones(len(entries)))
+
+        # Mean score per response, responses without images score 0
+        return torch.where(
+            counts > 0,
+            totals / counts.clamp(min=1),
+            torch.zeros_like(totals),
+        )
@@ -0,0 +1,262 @@
+import heapq
+import os
+from collections import deque
+from typing import IO, Deque, List, Optional, Set, Tuple
+
+from loguru import logger
+from pydantic import BaseModel
+
+from neurons.validator.schemas import Batch
+
+SEGMENT_SUFFIX = ".jsonl"
+
+
+class SpoolRecord(BaseModel):
+    seq: int
+    batch: Batch
+
+
+class BatchSpool:
+    """
+    Append only, on-disk queue of batches waiting to be uploaded.
+
+    Batches are written to segment files named after the sequence number
+    of their first record. Only a read-ahead window of at most
+    `max_memory` bytes is held in memory, everything else stays on disk.
+
+    Acknowledged batches move `head` forward (persisted), segments
+    behind it are deleted and a partially acknowledged first segment is
+    rewritten on open. Batches acknowledged out of order but not yet
+    behind `head` are uploaded again after a restart.
+    """
+
+    def __init__(self, path: str, max_memory: int, segment_size: int):
+        self.path = path
+        self.max_memory = max_memory
+        self.segment_size = segment_size
+
+        # Every batch before head has been acknowledged
+        self.head: int = 0
+        self.next_seq: int = 0
+        self.acked: Set[int] = set()
+
+        # First sequence number of every segment file
+        self.segments: List[int] = []
+        self.writer: Optional[IO[bytes]] = None
+
+        # Position of the next record to read into the window
+        self.read_segment: int = 0
+        self.read_offset: int = 0
+
+        self.window: Deque[Tuple[int, Batch, int]] = deque()
+        self.window_bytes: int = 0
+        self.retries: List[Tuple[int, Batch]] = []
+
+        self.open()
+
+    def __len__(self) -> int:
+        """Batches not acknowledged yet"""
+        return self.next_seq - self.head - len(self.acked)
+
+    def segment_path(self, start: int) -> str:
+        return os.path.join(self.path, f"{start:020d}{SEGMENT_SUFFIX}")
+
+    def head_path(self) -> str:
+        return os.path.join(self.path, "head")
+
+    def read_records(self, start: int) -> List[SpoolRecord]:
+        records: List[SpoolRecord] = []
+        with open(self.segment_path(start), "rb") as segment:
+            for line in segment:
+                try:
+                    records.append(SpoolRecord.model_validate_json(line))
+                except Exception:
+                    # Only the end of a segment can be torn
+                    logger.warning("Skipping unreadable spooled batch")
+
+        return records
+
+    def open(self) -> None:
+        os.makedirs(self.path, exist_ok=True)
+
+        if os.path.exists(self.head_path()):
+            with open(self.head_path()) as head_file:
+                self.head = int(head_file.read().strip() or 0)
+
+        self.segments = sorted(
+            int(name[: -len(SEGMENT_SUFFIX)])
+            for name in os.listdir(self.path)
+            if name.endswith(SEGMENT_SUFFIX)
+        )
+
+        self.compact()
+        if self.segments:
+            self.rewrite_first_segment()
+
+        if self.segments:
+            last: int = self.segments[-1]
+            records: List[SpoolRecord] = self.read_records(last)
+            self.next_seq = records[-1].seq + 1 if records else last
+
+            if not records:
+                os.remove(self.segment_path(last))
+                self.segments.pop()
+
+        # Always start a new segment,
+        # never appending after a record torn by a crash
+        self.next_seq = max(self.next_seq, self.head)
+        self.roll_segment()
+
+        if len(self):
+            logger.info(f"{len(self)} spooled batches waiting for upload")
+
+    def rewrite_first_segment(self) -> None:
+        first: int = self.segments[0]
+        if first >= self.head:
+            return
+
+        records: List[SpoolRecord] = [
+            record
+            for record in self.read_records(first)
+            if record.seq >= self.head
+        ]
+
+        tmp_path: str = self.segment_path(first) + ".tmp"
+        with open(tmp_path, "wb") as segment:
+            for record in records:
+                segment.write(record.model_dump_json().encode() + b"\n")
+
+        if not records and len(self.segments) > 1:
+            os.remove(tmp_path)
+            os.remove(self.segment_path(self.segments.pop(0)))
+            return
+
+        start: int = records[0].seq if records else self.head
+        os.replace(tmp_path, self.segment_path(start))
+        if start != first:
+            os.remove(self.segment_path(first))
+
+        self.segments[0] = start
+
+    def roll_segment(self) -> None:
+        if self.writer and self.writer.tell() < self.segment_size:
+            return
+
+        if self.writer:
+            self.writer.close()
+
+        self.segments.append(self.next_seq)
+        self.writer = open(self.segment_path(self.next_seq), "ab")
+
+    def append(self, batch: Batch) -> int:
+        """Write a batch to disk, returns its sequence number"""
+        self.roll_segment()
+
+        seq: int = self.next_seq
+        record = SpoolRecord(seq=seq, batch=batch)
+        self.writer.write(record.model_dump_json().encode() + b"\n")
+        self.writer.flush()
+
+        self.next_seq += 1
+        return seq
+
+    def read_record(self, line: bytes) -> None:
+        try:
+            record = SpoolRecord.model_validate_json(line)
+        except Exception:
+            logger.warning("Skipping unreadable spooled batch")
+            return
+
+        if record.seq < self.head or record.seq in self.acked:
+            return
+
+        self.window.append((record.seq, record.batch, len(line)))
+        self.window_bytes += len(line)
+
+    def is_window_full(self) -> bool:
+        # Always hold at least one record, so a huge batch can't stall
+        return bool(self.window) and self.window_bytes >= self.max_memory
+
+    def fill_window(self) -> None:
+        while self.read_segment < len(self.segments):
+            start: int = self.segments[self.read_segment]
+            with open(self.segment_path(start), "rb") as segment:
+                segment.seek(self.read_offset)
+
+                while not self.is_window_full():
+                    line: bytes = segment.readline()
+                    # End of file, or a torn record from before a restart
+                    if not line.endswith(b"\n"):
+                        break
+
+                    self.read_offset += len(line)
+                    self.read_record(line)
+
+                else:
+                    return
+
+            if self.read_segment == len(self.segments) - 1:
+                # Caught up with the writer
+                return
+
+            self.read_segment += 1
+            self.read_offset = 0
+
+    def pop(self) -> Optional[Tuple[int, Batch]]:
+        """Oldest batch not handed out yet, batches put back come first"""
+        if self.retries:
+            return heapq.heappop(self.retries)
+
+        if not self.window:
+            self.fill_window()
+
+        if not self.window:
+            return None
+
+        seq, batch, size = self.window.popleft()
+        self.window_bytes -= size
+        return seq, batch
+
+    def retry(self, seq: int, batch: Batch) -> None:
+        """Put a batch back, it's handed out again before newer ones"""
+        heapq.heappush(self.retries, (seq, batch))
+
+    def ack(self, seq: int) -> None:
+        """Mark a batch as uploaded (or dropped for good)"""
+        if seq < self.head:
+            return
+
+        self.acked.add(seq)
+
+        head: int = self.head
+        while head in self.acked:
+            self.acked.remove(head)
+            head += 1
+
+        if head == self.head:
+            return
+
+        self.head = head
+
+        tmp_path: str = self.head_path() + ".tmp"
+        with open(tmp_path, "w") as head_file:
+            head_file.write(str(self.head))
+        os.replace(tmp_path, self.head_path())
+
+        self.compact()
+
+    def compact(self) -> None:
+        """Delete segments where every batch has been acknowledged"""
+        while len(self.segments) > 1 and self.segments[1] <= self.head:
+            os.remove(self.segment_path(self.segments.pop(0)))
+
+            if self.read_segment > 0:
+                self.read_segment -= 1
+            else:
+                # Every record of the removed segment was read already
+                self.read_offset = 0
+
+    def close(self) -> None:
+        if self.writer:
+            self.writer.close()
+            self.writer = None
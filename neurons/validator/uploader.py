@@ -0,0 +1,326 @@
+import asyncio
+import os
+import queue
+import time
+from multiprocessing import Event, Queue
+from typing import List, Optional, Tuple
+
+import httpx
+import sentry_sdk
+from loguru import logger
+from pydantic import BaseModel
+from tenacity import (
+    AsyncRetrying,
+    RetryCallState,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+from neurons.validator.backend.client import TensorAlchemyBackendClient
+from neurons.validator.backend.exceptions import PostBatchError
+from neurons.validator.config import get_backend_client, get_config
+from neurons.validator.schemas import Batch
+from neurons.validator.spool import BatchSpool
+
+# Status codes worth sending the same batch again for
+RETRY_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class UploadMetrics(BaseModel):
+    uploaded: int = 0
+    # Batches given up on after every attempt
+    failed: int = 0
+    retries: int = 0
+    # Spooled batches put back until the backend is reachable
+    requeued: int = 0
+    in_flight: int = 0
+    upload_seconds: float = 0.0
+
+    # Counters at the previous report, for rates
+    reported_at: float = 0.0
+    reported_uploaded: int = 0
+
+    def report(self, queue_depth: int) -> str:
+        now: float = time.time()
+        elapsed: float = max(now - self.reported_at, 1e-6)
+        uploaded: int = self.uploaded - self.reported_uploaded
+
+        self.reported_at = now
+        self.reported_uploaded = self.uploaded
+
+        mean_seconds: float = self.upload_seconds / max(self.uploaded, 1)
+        return (
+            f"queue_depth={queue_depth} "
+            + f"in_flight={self.in_flight} "
+            + f"throughput={uploaded / elapsed * 60:.1f}/min "
+            + f"uploaded={self.uploaded} "
+            + f"failed={self.failed} "
+            + f"retries={self.retries} "
+            + f"requeued={self.requeued} "
+            + f"mean_upload={mean_seconds:.2f}s"
+        )
+
+
+class BatchUploader:
+    """
+    Uploads batches from the shared queue until `should_quit` is set.
+
+    One reader moves batches from the (blocking) multiprocessing queue
+    into a small local queue, which a fixed pool of workers drains.
+
+    With a spool, batches are written to disk first and handed to the
+    workers in order from there, so batches that can't reach the backend
+    are kept (and pending ones survive a restart) instead of dropped.
+    """
+
+    def __init__(
+        self,
+        backend_client: TensorAlchemyBackendClient,
+        batches_upload_queue: Queue,
+        should_quit: Event,
+        workers: int,
+        max_attempts: int,
+        max_backoff: float,
+        metrics_interval: float,
+        poll_timeout: float = 1.0,
+        spool: Optional[BatchSpool] = None,
+    ):
+        self.backend_client = backend_client
+        self.batches_upload_queue = batches_upload_queue
+        self.should_quit = should_quit
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.max_backoff = max_backoff
+        self.metrics_interval = metrics_interval
+        self.poll_timeout = poll_timeout
+        self.spool = spool
+
+        self.metrics = UploadMetrics(reported_at=time.time())
+
+        # Bounded so batches stay in the shared queue until a worker is free
+        self.pending: asyncio.Queue = None
+        # Set whenever the spool may have batches to hand out
+        self.spooled: asyncio.Event = None
+
+    def is_quitting(self) -> bool:
+        try:
+            return self.should_quit.is_set()
+        except Exception:
+            # The manager holding the event is gone
+            return True
+
+    def queue_depth(self) -> int:
+        depth: int = self.pending.qsize() if self.pending else 0
+        if self.spool is not None:
+            depth = len(self.spool)
+
+        try:
+            return depth + self.batches_upload_queue.qsize()
+        except Exception:
+            return depth
+
+    def get_batch(self) -> Optional[Batch]:
+        try:
+            return self.batches_upload_queue.get(timeout=self.poll_timeout)
+        except queue.Empty:
+            return None
+
+    async def add_batch(self, batch: Batch) -> None:
+        if self.spool is None:
+            await self.pending.put((None, batch))
+            return
+
+        self.spool.append(batch)
+        self.spooled.set()
+
+    async def read_batches(self) -> None:
+        while not self.is_quitting():
+            batch: Optional[Batch] = await asyncio.to_thread(self.get_batch)
+            if batch is not None:
+                await self.add_batch(batch)
+
+        if self.spool is None:
+            return
+
+        # Keep what is left in the shared queue for the next run
+        while True:
+            try:
+                await self.add_batch(self.batches_upload_queue.get_nowait())
+            except Exception:
+                return
+
+    async def dispatch_spooled(self) -> None:
+        while True:
+            item: Optional[Tuple[int, Batch]] = self.spool.pop()
+            if item is not None:
+                await self.pending.put(item)
+                continue
+
+            self.spooled.clear()
+            await self.spooled.wait()
+
+    async def post_batch(self, batch: Batch) -> bool:
+        response: httpx.Response = await self.backend_client.post_batch(batch)
+        if response.status_code == 200:
+            return True
+
+        message: str = (
+            f"uploading batch {batch.batch_id} failed with status_code "
+            + f"{response.status_code}: "
+            + self.backend_client._error_response_text(response)
+        )
+
+        if response.status_code in RETRY_STATUS_CODES:
+            raise PostBatchError(message)
+
+        # The backend rejected the batch, sending it again won't help
+        logger.error(message)
+        return False
+
+    def log_retry(self, retry_state: RetryCallState) -> None:
+        self.metrics.retries += 1
+        logger.warning(
+            f"Retrying batch upload (attempt {retry_state.attempt_number}): "
+            + str(retry_state.outcome.exception())
+        )
+
+    async def upload(self, batch: Batch) -> bool:
+        """False when the backend couldn't be reached after every attempt"""
+        logger.info(
+            f"uploading ({len(batch.computes)} compute "
+            + f"for batch {batch.batch_id} ..."
+        )
+
+        start: float = time.perf_counter()
+        uploaded: bool = False
+        self.metrics.in_flight += 1
+        try:
+            async for attempt in AsyncRetrying(
+                stop=stop_after_attempt(self.max_attempts),
+                wait=wait_random_exponential(
+                    multiplier=1, max=self.max_backoff
+                ),
+                retry=retry_if_exception_type(
+                    (PostBatchError, httpx.HTTPError)
+                ),
+                before_sleep=self.log_retry,
+                reraise=True,
+            ):
+                with attempt:
+                    uploaded = await self.post_batch(batch)
+
+        except Exception as e:
+            logger.error(
+                f"Failed to upload batch {batch.batch_id}: {e}",
+            )
+            sentry_sdk.capture_exception(e)
+            return False
+
+        finally:
+            self.metrics.in_flight -= 1
+
+        if not uploaded:
+            self.metrics.failed += 1
+            return True
+
+        self.metrics.uploaded += 1
+        self.metrics.upload_seconds += time.perf_counter() - start
+        return True
+
+    async def work(self) -> None:
+        while True:
+            seq, batch = await self.pending.get()
+            try:
+                reached: bool = await self.upload(batch)
+
+                if self.spool is None:
+                    if not reached:
+                        self.metrics.failed += 1
+
+                elif reached:
+                    self.spool.ack(seq)
+
+                else:
+                    # Keep it first in line and wait for the backend
+                    self.spool.retry(seq, batch)
+                    self.spooled.set()
+                    self.metrics.requeued += 1
+                    await asyncio.sleep(self.max_backoff)
+
+            finally:
+                self.pending.task_done()
+
+    async def report_metrics(self) -> None:
+        while True:
+            await asyncio.sleep(self.metrics_interval)
+            logger.info(
+                "[upload] " + self.metrics.report(self.queue_depth()),
+            )
+
+    async def run(self, drain_timeout: float = 30.0) -> None:
+        if self.is_quitting():
+            return
+
+        self.pending = asyncio.Queue(maxsize=self.workers)
+        self.spooled = asyncio.Event()
+
+        tasks: List[asyncio.Task] = [
+            asyncio.create_task(self.work()) for _i in range(self.workers)
+        ]
+        tasks.append(asyncio.create_task(self.report_metrics()))
+
+        if self.spool is not None:
+            self.spooled.set()
+            tasks.append(asyncio.create_task(self.dispatch_spooled()))
+
+        logger.info(f"Uploading batches with {self.workers} workers")
+
+        try:
+            await self.read_batches()
+
+            # Finish the batches already taken off the shared queue
+            await asyncio.wait_for(self.pending.join(), timeout=drain_timeout)
+
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"{self.pending.qsize()} batches not uploaded before exit"
+            )
+
+        finally:
+            for task in tasks:
+                task.cancel()
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+            logger.info("[upload] " + self.metrics.report(self.queue_depth()))
+
+            if self.spool is not None:
+                self.spool.close()
+
+
+async def upload_images_loop(
+    should_quit: Event,
+    batches_upload_queue: Queue,
+) -> None:
+    # Send new batches to the Human Validation Bot,
+    # runs until the validator quits
+    config = get_config()
+
+    spool: Optional[BatchSpool] = None
+    if config.alchemy.upload_spool:
+        spool = BatchSpool(
+            os.path.join(config.alchemy.full_path, "upload_spool"),
+            max_memory=config.alchemy.upload_spool_max_memory,
+            segment_size=config.alchemy.upload_spool_segment_size,
+        )
+
+    await BatchUploader(
+        get_backend_client(),
+        batches_upload_queue,
+        should_quit,
+        workers=config.alchemy.upload_workers,
+        max_attempts=config.alchemy.upload_max_attempts,
+        max_backoff=config.alchemy.upload_max_backoff,
+        metrics_interval=config.alchemy.upload_metrics_interval,
+        spool=spool,
+    ).run()
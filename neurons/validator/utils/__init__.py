@@ -5,7 +5,7 @@ import time
 import traceback
 from functools import lru_cache, update_wrapper, wraps
 from math import floor
-from typing import Any, Callable, List, Optional
+from typing import Any, Callable, Iterable, List, Optional
 
 import bittensor as bt
 import requests
@@ -15,6 +15,7 @@ from loguru import logger
 
 
 from neurons.utils.exceptions import BittensorBrokenPipe
+from neurons.utils.metagraph import get_metagraph_index
 from neurons.constants import (
     N_NEURONS_TO_QUERY,
     VPERMIT_TAO,
@@ -77,17 +78,53 @@ def check_uid_availability(
     """
     metagraph: bt.metagraph = get_metagraph()
 
-    # Filter non serving axons.
-    if not metagraph.axons[uid].is_serving:
-        return False
+    return bool(
+        get_metagraph_index(metagraph).get_available_mask(vpermit_tao_limit)[
+            uid
+        ]
+    )
+
+
+def get_eligible_mask(self) -> torch.BoolTensor:
+    """
+    Miners that can be queried at all, alive or not.
+    Cached until the metagraph syncs or the blacklists change.
+    """
+    return get_metagraph_index(self.metagraph).get_eligible_mask(
+        VPERMIT_TAO,
+        self.hotkey_blacklist,
+        self.coldkey_blacklist,
+    )
 
-    # Filter validator permit > 1024 stake.
-    if metagraph.validator_permit[uid]:
-        if metagraph.S[uid] > vpermit_tao_limit:
-            return False
 
-    # Available otherwise.
-    return True
+def get_candidate_uids(self, exclude: List[int] = None) -> List[int]:
+    mask: torch.BoolTensor = get_eligible_mask(self)
+    if exclude:
+        mask = mask.clone()
+        mask[[uid for uid in exclude if 0 <= uid < mask.size(0)]] = False
+
+    return torch.nonzero(mask).flatten().tolist()
+
+
+def zero_blacklisted(
+    scores: torch.Tensor,
+    metagraph: bt.metagraph,
+    hotkey_blacklist: Iterable[str],
+    coldkey_blacklist: Iterable[str],
+) -> torch.Tensor:
+    """A copy of per UID `scores` with blacklisted miners set to 0"""
+    blacklisted: torch.BoolTensor = get_metagraph_index(
+        metagraph
+    ).get_blacklist_mask(hotkey_blacklist, coldkey_blacklist)
+
+    n: int = min(scores.size(0), blacklisted.size(0))
+    return scores.masked_fill(
+        torch.nn.functional.pad(
+            blacklisted[:n],
+            (0, scores.size(0) - n),
+        ).to(scores.device),
+        0,
+    )
 
 
 async def get_random_uids(
@@ -103,32 +140,38 @@ async def get_random_uids(
         uids (torch.LongTensor): Randomly sampled available uids.
     Notes:
         If `k` is larger than the number of available `uids`, set `k` to the number of available `uids`.
+        Sampled from the background liveness probes while they are fresh,
+        the candidates are probed on the spot otherwise.
     """
-    candidate_uids = []
-    avail_uids = []
-
-    # Filter for only serving miners
-    for uid in range(self.metagraph.n.item()):
-        uid_is_available = check_uid_availability(uid, VPERMIT_TAO)
-        uid_is_not_excluded = exclude is None or uid not in exclude
-        if (
-            uid_is_available
-            and (self.metagraph.axons[uid].hotkey not in self.hotkey_blacklist)
-            and (
-                self.metagraph.axons[uid].coldkey not in self.coldkey_blacklist
-            )
-        ):
-            avail_uids.append(uid)
-            if uid_is_not_excluded:
-                candidate_uids.append(uid)
-
-    # Sort candidate UIDs by their count history
-    # This prioritises miners that have been queried less than average
-    # candidate_uids = [i for i,_ in sorted(zip(candidate_uids, [self.miner_query_history_count[self.metagraph.axons[uid].hotkey] for uid in candidate_uids]))]
-
-    # Random sort candidate_uids
-    random.seed(time.time())
-    random.shuffle(candidate_uids)
+    if self.liveness.is_fresh():
+        eligible: List[bool] = get_eligible_mask(self).tolist()
+        alive_uids: List[int] = self.liveness.sample(
+            len(self.liveness.alive_uids),
+            exclude=exclude,
+            is_candidate=lambda uid: uid < len(eligible) and eligible[uid],
+        )
+        final_uids: List[int] = self.query_history.order(alive_uids)[:k]
+        logger.info(
+            f"Sampled {len(final_uids)} uids"
+            + f" out of {len(self.liveness.alive_uids)} alive"
+        )
+        return torch.tensor(final_uids, dtype=torch.long)
+
+    logger.info("Liveness probes are stale, probing candidate uids")
+    return await probe_random_uids(self, k, exclude)
+
+
+async def probe_random_uids(
+    self,
+    k: int,
+    exclude: List[int] = None,
+) -> torch.LongTensor:
+    """Returns k random uids that respond to IsAlive right now"""
+    candidate_uids = get_candidate_uids(self, exclude)
+
+    # Miners not queried yet in this epoch first,
+    # then the least recently queried ones
+    candidate_uids = self.query_history.order(candidate_uids)
 
     # Find the first K uids that respond with IsAlive
     final_uids = []
@@ -5,11 +5,10 @@ import sys
 import time
 import traceback
 import uuid
-import queue
 from math import ceil
 from threading import Thread
 from multiprocessing import Event, Manager, Queue, Process, set_start_method
-from typing import List, Optional, Tuple, Union
+from typing import List, Optional, Set, Tuple, Union
 
 import bittensor as bt
 import sentry_sdk
@@ -18,8 +17,8 @@ import numpy as np
 from loguru import logger
 
 from neurons.constants import (
+    ADAPTIVE_PROBE_TIMEOUT_MIN,
     DEV_URL,
-    N_NEURONS,
     PROD_URL,
     VALIDATOR_SENTRY_DSN,
     IA_VALIDATOR_SETTINGS_FILE,
@@ -41,7 +40,7 @@ from neurons.utils import (
     background_loop,
 )
 from neurons.utils.log import configure_logging
-from neurons.validator.schemas import Batch
+from neurons.utils.metagraph import get_uid, rebuild_metagraph_index
 from neurons.validator.config import (
     get_device,
     get_config,
@@ -49,19 +48,25 @@ from neurons.validator.config import (
     get_metagraph,
     get_subtensor,
     get_backend_client,
+    close_backend_client,
     update_validator_settings,
     validator_run_id,
 )
-from neurons.validator.backend.client import TensorAlchemyBackendClient
 from neurons.validator.backend.models import TaskState
+from neurons.validator.executor import PreparedStep, StepPrefetcher
 from neurons.validator.forward import run_step
+from neurons.validator.history import MinerQueryHistory
+from neurons.validator.latency import LatencyTracker
+from neurons.validator.liveness import LivenessProber
+from neurons.validator.scoring.models.rewards.human import get_votes_cache
+from neurons.validator.uploader import upload_images_loop
 from neurons.validator.services.openai.service import get_openai_service
 from neurons.validator.utils.version import get_validator_version
 from neurons.validator.utils import (
     ttl_get_block,
     generate_random_prompt_gpt,
     get_device_name,
-    get_random_uids,
+    zero_blacklisted,
 )
 from neurons.validator.weights import (
     SetWeightsTask,
@@ -86,60 +91,11 @@ def is_valid_current_directory() -> bool:
     return False
 
 
-async def upload_image(
-    backend_client: TensorAlchemyBackendClient,
-    batches_upload_queue: Queue,
-) -> None:
-    queue_size: int = batches_upload_queue.qsize()
-    if queue_size > 0:
-        logger.info(f"{queue_size} batches in queue")
-
-    batch: Batch = batches_upload_queue.get(block=False)
-    logger.info(
-        #
-        f"uploading ({len(batch.computes)} compute "
-        + f"for batch {batch.batch_id} ..."
-    )
-    await backend_client.post_batch(batch)
-
-
-def upload_images_loop(
-    _should_quit: Event,
-    batches_upload_queue: Queue,
-) -> None:
-    # Send new batches to the Human Validation Bot
-    try:
-        backend_client: TensorAlchemyBackendClient = get_backend_client()
-        asyncio.run(
-            asyncio.gather(
-                *[
-                    upload_image(backend_client, batches_upload_queue)
-                    for _i in range(32)
-                ]
-            )
-        )
-
-    except queue.Empty:
-        return
-
-    except Exception as e:
-        logger.info(
-            "An error occurred trying to submit a batch: "
-            + f"{e}\n{traceback.format_exc()}"
-        )
-        sentry_sdk.capture_exception(e)
-
-
 class StableValidator:
     def loop_until_registered(self):
         index = None
         while True:
-            try:
-                index = self.metagraph.hotkeys.index(
-                    self.wallet.hotkey.ss58_address
-                )
-            except Exception:
-                pass
+            index = get_uid(self.metagraph, self.wallet.hotkey.ss58_address)
 
             if index is not None:
                 logger.info(
@@ -153,6 +109,7 @@ class StableValidator:
             )
             time.sleep(120)
             self.metagraph.sync(subtensor=self.subtensor)
+            rebuild_metagraph_index(self.metagraph)
 
     def __init__(self):
         # Init config
@@ -186,7 +143,7 @@ class StableValidator:
         # Init external API services
         self.openai_service = get_openai_service()
 
-        self.backend_client = TensorAlchemyBackendClient()
+        self.backend_client = get_backend_client()
 
         self.prompt_generation_failures = 0
 
@@ -223,13 +180,14 @@ class StableValidator:
 
         # Sync metagraph with subtensor.
         self.metagraph.sync(subtensor=self.subtensor)
+        rebuild_metagraph_index(self.metagraph)
         self.hotkeys = copy.deepcopy(self.metagraph.hotkeys)
 
         if "mock" not in self.config.wallet.name:
             # Wait until the miner is registered
             self.loop_until_registered()
 
-        self.uid = self.metagraph.hotkeys.index(self.wallet.hotkey.ss58_address)
+        self.uid = get_uid(self.metagraph, self.wallet.hotkey.ss58_address)
         logger.info("Loaded metagraph")
 
         # Convert metagraph[x] to a PyTorch tensor if it's a NumPy array
@@ -250,11 +208,14 @@ class StableValidator:
         self.moving_average_scores = torch.zeros(
             (self.metagraph.n),
         ).to(self.device)
+        # Concurrent steps merge their scores one at a time
+        self.moving_average_lock = asyncio.Lock()
 
         # Each validator gets a unique identity (UID)
         # in the network for differentiation.
-        self.my_subnet_uid = self.metagraph.hotkeys.index(
-            self.wallet.hotkey.ss58_address
+        self.my_subnet_uid = get_uid(
+            self.metagraph,
+            self.wallet.hotkey.ss58_address,
         )
         validator_version = get_validator_version()
         logger.info(
@@ -293,6 +254,18 @@ class StableValidator:
         self.isalive_threshold = 8
         self.isalive_dict = {i: 0 for i in range(self.metagraph.n.item())}
 
+        # Response times of miners, for adaptive timeouts
+        self.query_latency = LatencyTracker()
+        self.probe_latency = LatencyTracker()
+
+        # IsAlive results of every candidate miner, probed in the background
+        self.liveness = LivenessProber(
+            self,
+            interval=self.config.alchemy.liveness_interval,
+            ttl=self.config.alchemy.liveness_ttl,
+            concurrency=self.config.alchemy.liveness_concurrency,
+        )
+
         # Init stats
         self.stats = get_defaults(self)
 
@@ -309,28 +282,8 @@ class StableValidator:
         self.set_weights_queue: Queue = manager.Queue(maxsize=128)
         self.batches_upload_queue: Queue = manager.Queue(maxsize=2048)
 
-        # Create a Dict for storing miner query history
-        try:
-            self.miner_query_history_duration = {
-                self.metagraph.axons[uid].hotkey: float("inf")
-                for uid in range(self.metagraph.n.item())
-            }
-        except Exception:
-            pass
-        try:
-            self.miner_query_history_count = {
-                self.metagraph.axons[uid].hotkey: 0
-                for uid in range(self.metagraph.n.item())
-            }
-        except Exception:
-            pass
-        try:
-            self.miner_query_history_fail_count = {
-                self.metagraph.axons[uid].hotkey: 0
-                for uid in range(self.metagraph.n.item())
-            }
-        except Exception:
-            pass
+        # How often and when every miner was queried
+        self.query_history = MinerQueryHistory(self.metagraph.hotkeys)
 
         self.model_type = ModelType.CUSTOM
 
@@ -391,39 +344,49 @@ class StableValidator:
 
             if attr_name == "background_timer":
                 new_thread.daemon = True
+            else:
+                # Each subprocess pools its own backend connections
+                new_thread.on_exit = close_backend_client
 
             setattr(self, attr_name, new_thread)
             self.start_thread(new_thread, is_startup)
 
+    def get_probe_timeout(self, hotkey: str) -> float:
+        config: bt.config = get_config()
+        if not config.alchemy.adaptive_timeout:
+            return config.alchemy.async_timeout
+
+        return self.probe_latency.timeout_for(
+            [hotkey],
+            q=config.alchemy.adaptive_timeout_quantile,
+            margin=config.alchemy.adaptive_timeout_margin,
+            min_timeout=ADAPTIVE_PROBE_TIMEOUT_MIN,
+            max_timeout=config.alchemy.async_timeout,
+        )
+
     async def check_uid(self, uid, response_times):
         try:
             t1 = time.perf_counter()
             metagraph: bt.metagraph = get_metagraph()
+            hotkey: str = metagraph.axons[uid].hotkey
             response = await self.dendrite.forward(
                 synapse=IsAlive(),
                 axons=metagraph.axons[uid],
-                timeout=get_config().alchemy.async_timeout,
+                timeout=self.get_probe_timeout(hotkey),
             )
             if response.is_success:
-                response_times.append(time.perf_counter() - t1)
+                latency: float = time.perf_counter() - t1
+                response_times.append(latency)
+                self.probe_latency.record(hotkey, latency)
+                self.liveness.record(uid, True, latency)
                 self.isalive_dict[uid] = 0
                 return True
             else:
+                self.probe_latency.record_failure(hotkey)
+                self.liveness.record(uid, False)
                 try:
                     self.isalive_dict[uid] += 1
-                    key = self.metagraph.axons[uid].hotkey
-                    self.miner_query_history_fail_count[key] += 1
-                    # If miner doesn't respond for 3 iterations rest it's count to
-                    # the average to avoid spamming
-                    if self.miner_query_history_fail_count[key] >= 3:
-                        self.miner_query_history_duration[
-                            key
-                        ] = time.perf_counter()
-                        self.miner_query_history_count[key] = int(
-                            np.array(
-                                list(self.miner_query_history_count.values())
-                            ).mean()
-                        )
+                    self.query_history.record_failure(uid)
                 except Exception:
                     pass
                 return False
@@ -431,6 +394,7 @@ class StableValidator:
             logger.error(
                 f"Error checking UID {uid}: {e}\n{traceback.format_exc()}"
             )
+            self.liveness.record(uid, False)
             return False
 
     async def reload_settings(self) -> None:
@@ -449,81 +413,48 @@ class StableValidator:
         self.load_state()
         self.step = 0
         exit_code: int = 1
-        while not self.should_quit.is_set():
-            try:
-                logger.info(
-                    f"Started new validator run ({validator_run_id.get()})."
-                )
 
-                # Get a random number of uids
-                try:
-                    uids = await get_random_uids(
-                        self,
-                        k=N_NEURONS,
-                    )
-                    uids = uids.to(self.device)
-                    axons = [self.metagraph.axons[uid] for uid in uids]
+        steps_in_flight: int = max(self.config.alchemy.steps_in_flight, 1)
+        prefetcher = StepPrefetcher(
+            self,
+            depth=max(self.config.alchemy.step_prefetch_depth, steps_in_flight),
+        )
+        self.liveness.start()
+        get_votes_cache().start()
+        prefetcher.start()
 
-                except Exception as e:
-                    logger.error(
-                        #
-                        "Failed to get random uids from metagraph: "
-                        + str(e)
+        running: Set[asyncio.Task] = set()
+        while not self.should_quit.is_set():
+            try:
+                for finished in [task for task in running if task.done()]:
+                    running.discard(finished)
+                    # Raises what the step couldn't handle itself
+                    finished.result()
+
+                if len(running) >= steps_in_flight:
+                    await asyncio.wait(
+                        running,
+                        timeout=1,
+                        return_when=asyncio.FIRST_COMPLETED,
                     )
                     continue
 
-                task: Optional[
-                    ImageGenerationTaskModel
-                ] = await self.get_image_generation_task()
-
-                if task is None:
-                    logger.warning(
-                        "image generation task was not generated successfully."
-                    )
-
-                    # Prevent loop from forming if the task
-                    # error occurs on the first step
-                    if self.step == 0:
-                        self.step += 1
-
+                # The UIDs and the task were prepared
+                # while the previous steps were running
+                step: Optional[PreparedStep] = await prefetcher.next_step()
+                if step is None:
                     continue
 
                 if self.should_quit.is_set():
+                    prefetcher.release(step)
                     break
 
-                # Text to Image Run
-                await run_step(
-                    validator=self,
-                    task=task,
-                    axons=axons,
-                    uids=uids,
-                    model_type=self.model_type,
-                    stats=self.stats,
+                running.add(
+                    asyncio.create_task(
+                        self.run_prepared_step(prefetcher, step),
+                    )
                 )
 
-                if self.should_quit.is_set():
-                    break
-
-                try:
-                    # Re-sync with the network. Updates the metagraph.
-                    await self.sync()
-                except Exception as e:
-                    logger.error(f"Failed to sync the metagraph: {e}")
-
-                # Save Previous Sates
-                self.save_state()
-
-                # Load any new settings from gcloud
-                self.reload_settings()
-
-                # (Restart) all background threads
-                # This can happen sometimes rarely
-                # because of a segfault
-                self.start_threads(is_startup=False)
-
-                # End the current step and prepare for the next iteration.
-                self.step += 1
-
             except BittensorBrokenPipe:
                 # Sometimes we want to restart the validator
                 # due to an unexpected error in Bittensor (broken pipe 😢)
@@ -543,8 +474,19 @@ class StableValidator:
                 logger.error(traceback.format_exc())
                 sentry_sdk.capture_exception(e)
 
+        await prefetcher.stop()
+        await self.liveness.stop()
+        await get_votes_cache().stop()
+
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+
         self.axon.stop()
 
+        # Let the uploader finish the batches it is working on
+        self.should_quit.set()
+
         threads: List = [
             self.background_timer,
             self.set_weights_process,
@@ -558,11 +500,71 @@ class StableValidator:
         except Exception:
             pass
 
+        await close_backend_client()
+
         if exit_code == 1:
             broken_pipe_message()
 
         sys.exit(exit_code)
 
+    async def run_prepared_step(
+        self,
+        prefetcher: StepPrefetcher,
+        step: PreparedStep,
+    ) -> None:
+        try:
+            logger.info(
+                f"Started new validator run ({validator_run_id.get()})."
+            )
+
+            axons = [self.metagraph.axons[uid] for uid in step.uids]
+
+            # Text to Image Run
+            await run_step(
+                validator=self,
+                task=step.task,
+                axons=axons,
+                uids=step.uids,
+                model_type=step.model_type,
+                stats=self.stats,
+            )
+
+            if self.should_quit.is_set():
+                return
+
+            # Steps finish concurrently, only one of them syncs at a time
+            async with self.moving_average_lock:
+                try:
+                    # Re-sync with the network. Updates the metagraph.
+                    await self.sync()
+                except Exception as e:
+                    logger.error(f"Failed to sync the metagraph: {e}")
+
+                # Save Previous Sates
+                self.save_state()
+
+                # Load any new settings from gcloud
+                self.reload_settings()
+
+                # (Restart) all background threads
+                # This can happen sometimes rarely
+                # because of a segfault
+                self.start_threads(is_startup=False)
+
+                # End the current step and prepare for the next iteration.
+                self.step += 1
+
+        except BittensorBrokenPipe:
+            raise
+
+        # If we encounter an unexpected error, log it for debugging.
+        except Exception as e:
+            logger.error(traceback.format_exc())
+            sentry_sdk.capture_exception(e)
+
+        finally:
+            prefetcher.release(step)
+
     async def get_image_generation_task(
         self,
         timeout: int = 60,
@@ -641,7 +643,14 @@ class StableValidator:
                 SetWeightsTask(
                     epoch=ttl_get_block(),
                     hotkeys=copy.deepcopy(self.hotkeys),
-                    weights=tensor_to_list(self.moving_average_scores),
+                    weights=tensor_to_list(
+                        zero_blacklisted(
+                            self.moving_average_scores,
+                            self.metagraph,
+                            self.hotkey_blacklist,
+                            self.coldkey_blacklist,
+                        )
+                    ),
                 )
             )
             logger.info("Added a weight setting task to the queue")
@@ -652,14 +661,7 @@ class StableValidator:
         """
         Retrieve the given miner's index in the metagraph.
         """
-        index = None
-        try:
-            index = self.metagraph.hotkeys.index(
-                self.wallet.hotkey.ss58_address,
-            )
-        except ValueError:
-            pass
-        return index
+        return get_uid(self.metagraph, self.wallet.hotkey.ss58_address)
 
     def get_validator_info(self):
         return {
@@ -680,6 +682,7 @@ class StableValidator:
 
         # Sync the metagraph.
         self.metagraph.sync(subtensor=self.subtensor)
+        rebuild_metagraph_index(self.metagraph)
 
         # Check if the metagraph axon info has changed.
         if previous_metagraph.axons == self.metagraph.axons:
@@ -690,14 +693,17 @@ class StableValidator:
             + " dendrite pool and moving averages"
         )
 
+        # bittensor rebuilds the hotkeys list on every access
+        new_hotkeys: List[str] = self.metagraph.hotkeys
+
         # Zero out all hotkeys that have been replaced.
         for uid, hotkey in enumerate(self.hotkeys):
-            if hotkey != self.metagraph.hotkeys[uid]:
+            if hotkey != new_hotkeys[uid]:
                 self.scores[uid] = 0  # hotkey has been replaced
 
         # Check to see if the metagraph has changed size.
         # If so, we need to add new hotkeys and moving averages.
-        if len(self.hotkeys) < len(self.metagraph.hotkeys):
+        if len(self.hotkeys) < len(new_hotkeys):
             # Update the size of the moving average scores.
             new_moving_average = torch.zeros((self.metagraph.n)).to(self.device)
             min_len = min(len(self.hotkeys), len(self.scores))
@@ -710,7 +716,8 @@ class StableValidator:
                     self.isalive_dict[uid] = 0
 
         # Update the hotkeys.
-        self.hotkeys = copy.deepcopy(self.metagraph.hotkeys)
+        self.hotkeys = copy.deepcopy(new_hotkeys)
+        self.query_history.sync(self.hotkeys)
 
     def check_registered(self):
         # --- Check for registration.
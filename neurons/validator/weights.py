@@ -1,7 +1,7 @@
 import queue
 import asyncio
 import traceback
-from typing import List
+from typing import List, Optional
 from multiprocessing import Event, Queue
 
 import torch
@@ -10,6 +10,7 @@ from loguru import logger
 from pydantic import BaseModel, ConfigDict
 
 from neurons.utils.exceptions import BittensorBrokenPipe
+from neurons.utils.metagraph import MetagraphIndex, get_metagraph_index
 from neurons.validator.config import (
     get_config,
     get_wallet,
@@ -95,16 +96,19 @@ async def set_weights(
     # New list to store weights for valid hotkeys
     valid_weights: List[float] = []
 
+    index: MetagraphIndex = get_metagraph_index(metagraph)
     for hotkey, weight in zip(hotkeys, raw_weights):
-        try:
-            # Only add weight if hotkey is found
-            valid_uids.append(metagraph.hotkeys.index(hotkey))
-            valid_weights.append(weight)
-        except ValueError:
+        uid: Optional[int] = index.get_uid(hotkey)
+        if uid is None:
             logger.warning(
                 f"Hotkey {hotkey} not found in metagraph,"
                 + " no weight will be set"
             )
+            continue
+
+        # Only add weight if hotkey is found
+        valid_uids.append(uid)
+        valid_weights.append(weight)
 
     try:
         # Now uids and valid_weights have the same length
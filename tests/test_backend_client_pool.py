@@ -0,0 +1,124 @@
+import asyncio
+import json
+import unittest
+from typing import Dict, List
+
+import bittensor as bt
+
+from neurons.validator.backend.client import TensorAlchemyBackendClient
+
+
+class StandInBackend:
+    """Minimal keep-alive HTTP/1.1 server standing in for the backend"""
+
+    def __init__(self):
+        self.server: asyncio.AbstractServer = None
+        self.connections: int = 0
+        self.requests: List[Dict[str, str]] = []
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/api"
+
+    async def start(self) -> None:
+        self.server = await asyncio.start_server(
+            self.handle, host="127.0.0.1", port=0
+        )
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+    def respond(self, _headers: Dict[str, str]) -> bytes:
+        body = json.dumps({"votes": []}).encode()
+        return (
+            b"HTTP/1.1 200 OK\r\n"
+            + b"Content-Type: application/json\r\n"
+            + f"Content-Length: {len(body)}\r\n\r\n".encode()
+            + body
+        )
+
+    async def handle(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode().split("\r\n")
+                headers = {
+                    key.lower(): value
+                    for key, value in (
+                        line.split(": ", 1) for line in lines[1:] if line
+                    )
+                }
+                headers["request-line"] = lines[0]
+                await reader.readexactly(int(headers.get("content-length", 0)))
+                self.requests.append(headers)
+
+                writer.write(self.respond(headers))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+class TestBackendClientPool(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.backend = StandInBackend()
+        await self.backend.start()
+
+        mnemonic = bt.Keypair.generate_mnemonic(12)
+        self.client = TensorAlchemyBackendClient(
+            hotkey=bt.Keypair.create_from_mnemonic(mnemonic),
+            api_url=self.backend.url,
+        )
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.backend.stop()
+
+    async def test_connection_reused_between_calls(self):
+        for _ in range(5):
+            self.assertEqual(await self.client.get_votes(), {"votes": []})
+
+        self.assertEqual(self.backend.connections, 1)
+        self.assertEqual(len(self.backend.requests), 5)
+
+        # Every request still goes through the event hooks
+        for headers in self.backend.requests:
+            self.assertEqual(headers["request-line"], "GET /api/votes HTTP/1.1")
+            self.assertIn("x-signature", headers)
+            self.assertIn("x-timestamp", headers)
+
+    async def test_concurrent_calls_share_one_pool(self):
+        await asyncio.gather(*[self.client.get_votes() for _ in range(8)])
+
+        self.assertEqual(len(self.backend.requests), 8)
+        self.assertLessEqual(
+            self.backend.connections,
+            self.client.config.alchemy.backend_max_connections,
+        )
+
+        # Idle connections are reused by the next round of calls
+        connections = self.backend.connections
+        await asyncio.gather(*[self.client.get_votes() for _ in range(4)])
+        self.assertEqual(self.backend.connections, connections)
+
+    async def test_close_releases_connections(self):
+        await self.client.get_votes()
+        http_client = self.client._client()
+
+        await self.client.close()
+        self.assertTrue(http_client.is_closed)
+
+        # Closing twice is fine, and the next call opens a new pool
+        await self.client.close()
+        await self.client.get_votes()
+
+        self.assertIsNot(self.client._client(), http_client)
+        self.assertEqual(self.backend.connections, 2)
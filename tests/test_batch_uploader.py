@@ -0,0 +1,123 @@
+import asyncio
+import queue
+import threading
+import unittest
+from typing import Dict, List
+
+import httpx
+
+from neurons.validator.schemas import Batch
+from neurons.validator.uploader import BatchUploader
+
+
+def create_batch(batch_id: str) -> Batch:
+    return Batch(
+        batch_id=batch_id,
+        prompt="test",
+        computes=[],
+        nsfw_scores=[],
+        miner_hotkeys=[],
+        miner_coldkeys=[],
+        validator_hotkey="fake_hotkey",
+    )
+
+
+class StandInBackendClient:
+    """Replies with queued status codes per batch, 200 once they run out"""
+
+    def __init__(self, status_codes: Dict[str, List[int]] = None):
+        self.status_codes = status_codes or {}
+        self.posted: List[str] = []
+        self.in_flight: int = 0
+        self.max_in_flight: int = 0
+
+    async def post_batch(self, batch: Batch) -> httpx.Response:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.in_flight -= 1
+
+        self.posted.append(batch.batch_id)
+
+        codes: List[int] = self.status_codes.get(batch.batch_id, [])
+        return httpx.Response(codes.pop(0) if codes else 200, text="nope")
+
+    def _error_response_text(self, response: httpx.Response) -> str:
+        return response.text
+
+
+class TestBatchUploader(unittest.IsolatedAsyncioTestCase):
+    def create_uploader(
+        self,
+        backend_client: StandInBackendClient,
+        workers: int = 4,
+    ) -> BatchUploader:
+        self.queue = queue.Queue()
+        self.should_quit = threading.Event()
+
+        return BatchUploader(
+            backend_client,
+            self.queue,
+            self.should_quit,
+            workers=workers,
+            max_attempts=3,
+            max_backoff=0.01,
+            metrics_interval=60,
+            poll_timeout=0.01,
+        )
+
+    async def run_until_empty(self, uploader: BatchUploader) -> None:
+        task = asyncio.create_task(uploader.run())
+
+        while self.queue.qsize() or uploader.pending.qsize():
+            await asyncio.sleep(0.01)
+
+        self.should_quit.set()
+        await asyncio.wait_for(task, timeout=5)
+
+    async def test_uploads_with_fixed_worker_pool(self):
+        backend_client = StandInBackendClient()
+        uploader = self.create_uploader(backend_client, workers=4)
+
+        for i in range(20):
+            self.queue.put(create_batch(str(i)))
+
+        await self.run_until_empty(uploader)
+
+        self.assertEqual(
+            sorted(backend_client.posted, key=int), [str(i) for i in range(20)]
+        )
+        self.assertEqual(backend_client.max_in_flight, 4)
+        self.assertEqual(uploader.metrics.uploaded, 20)
+        self.assertEqual(uploader.metrics.in_flight, 0)
+
+    async def test_retries_until_uploaded(self):
+        backend_client = StandInBackendClient({"flaky": [503, 429]})
+        uploader = self.create_uploader(backend_client)
+        self.queue.put(create_batch("flaky"))
+
+        await self.run_until_empty(uploader)
+
+        self.assertEqual(backend_client.posted, ["flaky"] * 3)
+        self.assertEqual(uploader.metrics.uploaded, 1)
+        self.assertEqual(uploader.metrics.retries, 2)
+        self.assertEqual(uploader.metrics.failed, 0)
+
+    async def test_gives_up_on_failed_batches(self):
+        backend_client = StandInBackendClient(
+            {"down": [502, 502, 502, 502], "rejected": [422]}
+        )
+        uploader = self.create_uploader(backend_client)
+        self.queue.put(create_batch("down"))
+        self.queue.put(create_batch("rejected"))
+        self.queue.put(create_batch("ok"))
+
+        await self.run_until_empty(uploader)
+
+        # Rejected batches are not sent again
+        self.assertEqual(backend_client.posted.count("down"), 3)
+        self.assertEqual(backend_client.posted.count("rejected"), 1)
+        self.assertEqual(uploader.metrics.uploaded, 1)
+        self.assertEqual(uploader.metrics.failed, 2)
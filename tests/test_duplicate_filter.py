@@ -362,3 +362,63 @@ async def test_specific_different_images(duplicate_filter, mock_metagraph):
         assert duplicate_filter.compute_phash(
             image_a
         ) != duplicate_filter.compute_phash(image_b)
+
+
+@pytest.mark.parametrize("hash_size", [8, 16])
+def test_similarity_matrix_matches_pairwise_hashes(hash_size):
+    duplicate_filter = DuplicateFilter(hash_size=hash_size)
+
+    shared_image = create_complex_image()
+    images = [
+        [shared_image, create_complex_image()],
+        [shared_image],
+        [create_complex_image(), create_complex_image()],
+        [apply_fixed_transform(shared_image)],
+    ]
+    synapses = [
+        create_synapse(
+            f"hotkey{i}",
+            [torch.tensor(np.array(image)).permute(2, 0, 1) for image in row],
+        )
+        for i, row in enumerate(images)
+    ]
+
+    similar = duplicate_filter.similarity_matrix(
+        *duplicate_filter.hash_responses(synapses)
+    )
+
+    all_hashes = [
+        [duplicate_filter.compute_phash(image) for image in synapse.images]
+        for synapse in synapses
+    ]
+    for i, hashes_i in enumerate(all_hashes):
+        for j, hashes_j in enumerate(all_hashes):
+            assert similar[i, j] == any(
+                duplicate_filter.are_images_similar(hash1, hash2)
+                for hash1, hash2 in zip(hashes_i, hashes_j)
+            )
+
+
+@pytest.mark.asyncio
+async def test_duplicates_paired_with_first_match(mock_metagraph):
+    with patch(
+        "neurons.validator.scoring.models.masks.duplicate.get_metagraph",
+        return_value=mock_metagraph,
+    ), patch(
+        "neurons.validator.scoring.models.base.get_metagraph",
+        return_value=mock_metagraph,
+    ):
+        image = torch.tensor(np.array(create_complex_image())).permute(2, 0, 1)
+
+        # The first response only pairs with the second one,
+        # the third copy has nothing left after it to pair with
+        mask = await DuplicateFilter().get_rewards(
+            None,
+            [
+                create_synapse("hotkey1", [image]),
+                create_synapse("hotkey2", [image]),
+                create_synapse("hotkey3", [image]),
+            ],
+        )
+
+        assert torch.allclose(mask, torch.tensor([1.0, 1.0, 0.0, 0.0, 0.0]))
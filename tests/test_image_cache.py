@@ -0,0 +1,66 @@
+import torch
+
+from neurons.protocol import ImageGeneration
+from neurons.utils.image import (
+    decoded_image_cache,
+    image_to_base64,
+    image_to_tensor,
+    synapse_to_image,
+    synapse_to_tensor,
+    synapse_to_uint8_tensor,
+)
+
+from tests.fixtures import create_complex_image
+
+
+def create_synapse(num_images: int = 1) -> ImageGeneration:
+    return ImageGeneration(
+        images=[
+            image_to_base64(create_complex_image()) for _ in range(num_images)
+        ],
+    )
+
+
+def test_images_decoded_once_inside_cache():
+    synapse = create_synapse(num_images=2)
+
+    with decoded_image_cache() as cache:
+        first = synapse_to_tensor(synapse, 0)
+        assert synapse_to_tensor(synapse, 0) is first
+        assert synapse_to_image(synapse, 0) is synapse_to_image(synapse, 0)
+
+        # Each image index gets its own entry
+        assert synapse_to_tensor(synapse, 1) is not first
+        assert len(cache) == 2
+
+    # Nothing is shared once the cache has been dropped
+    assert synapse_to_tensor(synapse, 0) is not first
+    assert len(cache) == 0
+
+
+def test_cached_forms_match_uncached_decoding():
+    synapse = create_synapse()
+
+    expected_float = synapse_to_tensor(synapse)
+    expected_uint8 = synapse_to_uint8_tensor(synapse)
+
+    with decoded_image_cache():
+        assert torch.equal(synapse_to_tensor(synapse), expected_float)
+        assert torch.equal(synapse_to_uint8_tensor(synapse), expected_uint8)
+        assert torch.equal(
+            image_to_tensor(synapse_to_image(synapse)),
+            expected_float,
+        )
+
+    assert expected_uint8.dtype == torch.uint8
+    assert torch.equal(expected_uint8.float() / 255, expected_float)
+
+
+def test_cache_follows_replaced_images():
+    synapse = create_synapse()
+
+    with decoded_image_cache():
+        before = synapse_to_tensor(synapse)
+        synapse.images = [image_to_base64(create_complex_image())]
+
+        assert synapse_to_tensor(synapse) is not before
@@ -0,0 +1,49 @@
+import base64
+from io import BytesIO
+
+from neurons.protocol import ImageGeneration
+from neurons.utils.image import (
+    base64_to_image,
+    image_to_base64,
+    is_base64_png,
+    synapse_to_base64,
+)
+
+from tests.fixtures import create_complex_image
+
+
+def test_miner_png_passed_through():
+    b64_image = image_to_base64(create_complex_image())
+    synapse = ImageGeneration(images=[b64_image])
+
+    assert is_base64_png(b64_image)
+    assert synapse_to_base64(synapse) is b64_image
+
+
+def test_other_images_encoded_as_png():
+    image = create_complex_image()
+
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG")
+    b64_jpeg = base64.b64encode(buffer.getvalue()).decode("utf-8")
+    assert not is_base64_png(b64_jpeg)
+
+    synapse = ImageGeneration(images=[b64_jpeg])
+    b64_png = synapse_to_base64(synapse)
+
+    assert isinstance(b64_png, str)
+    assert is_base64_png(b64_png)
+    assert base64_to_image(b64_png).size == image.size
+
+
+def test_invalid_png_headers_rejected():
+    b64_image = image_to_base64(create_complex_image())
+
+    assert not is_base64_png("")
+    assert not is_base64_png(b64_image[:16])
+    assert not is_base64_png("!" + b64_image)
+    assert not is_base64_png(base64.b64encode(b"\x89PNG\r\n\x1a\n" * 4))
+
+    # Signature followed by a zero sized IHDR chunk
+    header = b"\x89PNG\r\n\x1a\n" + b"\x00\x00\x00\x0dIHDR" + b"\x00" * 8
+    assert not is_base64_png(base64.b64encode(header).decode())
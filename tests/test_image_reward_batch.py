@@ -0,0 +1,102 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+import torch
+import torchvision.transforms as T
+from ImageReward.ImageReward import ImageReward
+
+from neurons.utils.image import image_to_base64
+from neurons.validator.scoring.models import ImageRewardModel
+
+from tests.fixtures import create_complex_image
+from tests.test_unit_reward_models import create_mock_synapse
+
+
+class MockTokenized(SimpleNamespace):
+    def to(self, _device):
+        return self
+
+
+class MockBlip:
+    def __init__(self):
+        torch.manual_seed(0)
+        self.projection = torch.nn.Linear(3, 8)
+
+    def tokenizer(self, prompt, max_length, **_kwargs):
+        ids = torch.tensor([[ord(c) for c in prompt[:max_length]]])
+        return MockTokenized(
+            input_ids=ids,
+            attention_mask=torch.ones_like(ids),
+        )
+
+    def visual_encoder(self, pixels):
+        # [batch, 3, h, w] -> [batch, 4 patches, 8 features]
+        patches = pixels.unfold(2, 4, 4).unfold(3, 4, 4).mean((-1, -2))
+        return self.projection(patches.flatten(2).transpose(1, 2)[:, :4])
+
+    def text_encoder(
+        self,
+        input_ids,
+        attention_mask,
+        encoder_hidden_states,
+        encoder_attention_mask,
+        return_dict,
+    ):
+        text = (input_ids * attention_mask).float().mean(-1, keepdim=True)
+        hidden = encoder_hidden_states.mean(1) * text / 100
+        return SimpleNamespace(last_hidden_state=hidden.unsqueeze(1))
+
+
+class MockImageRewardNetwork:
+    inference_rank = ImageReward.inference_rank
+
+    def __init__(self):
+        self.device = "cpu"
+        self.blip = MockBlip()
+        self.preprocess = T.Compose([T.Resize((8, 8)), T.ToTensor()])
+        self.mlp = torch.nn.Linear(8, 1)
+        self.mean = 0.17
+        self.std = 1.03
+
+    def load(self, *_args, **_kwargs):
+        return self
+
+
+def create_response(num_images: int, hotkey: str):
+    return create_mock_synapse(
+        [image_to_base64(create_complex_image()) for _ in range(num_images)],
+        64,
+        64,
+        hotkey,
+    )
+
+
+@pytest.mark.asyncio
+@patch(
+    "neurons.validator.scoring.models.rewards.image_reward.IMAGE_REWARD_BATCH_SIZE",
+    2,
+)
+@patch(
+    "neurons.validator.scoring.models.rewards.image_reward.RM",
+    MockImageRewardNetwork(),
+)
+async def test_batched_scores_match_inference_rank():
+    model = ImageRewardModel()
+    assert model.can_batch()
+
+    responses = [
+        create_response(1, "hotkey_0"),
+        create_response(3, "hotkey_1"),
+        create_response(0, "hotkey_2"),
+        create_response(2, "hotkey_3"),
+    ]
+
+    batched = await model.get_rewards_batch(responses[0], responses)
+    expected = torch.tensor(
+        [model.get_reward(response) for response in responses]
+    )
+
+    assert batched.shape == (len(responses),)
+    assert batched[2] == 0.0
+    assert torch.allclose(batched, expected, atol=1e-5)
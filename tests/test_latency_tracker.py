@@ -0,0 +1,90 @@
+import unittest
+
+import bittensor as bt
+
+from neurons.validator.forward import cut_off_response, record_query_latency
+from neurons.validator.latency import LatencyTracker
+
+
+def create_response(hotkey: str, status_code: int, process_time=None):
+    response = bt.Synapse()
+    response.axon = bt.TerminalInfo(hotkey=hotkey)
+    response.dendrite.status_code = status_code
+    response.dendrite.process_time = process_time
+    return response
+
+
+class TestLatencyTracker(unittest.TestCase):
+    def test_ewma(self):
+        tracker = LatencyTracker(alpha=0.5)
+        tracker.record("a", 2.0)
+        tracker.record("a", 4.0)
+
+        self.assertAlmostEqual(tracker.get("a").ewma, 3.0)
+        self.assertEqual(tracker.get("a").successes, 2)
+
+    def test_quantile_of_latest_samples(self):
+        tracker = LatencyTracker(window=4, min_samples=1)
+        for latency in [100.0, 1.0, 2.0, 3.0, 4.0]:
+            tracker.record("a", latency)
+
+        # The first sample was overwritten
+        self.assertEqual(tracker.quantile(["a"], 1.0), 4.0)
+        self.assertEqual(tracker.quantile(["a"], 0.0), 1.0)
+
+    def test_quantile_pools_hotkeys(self):
+        tracker = LatencyTracker(min_samples=1)
+        tracker.record("a", 1.0)
+        tracker.record("b", 9.0)
+
+        self.assertEqual(tracker.quantile(["a", "b"], 1.0), 9.0)
+        self.assertEqual(tracker.quantile(["a", "unknown"], 1.0), 1.0)
+        self.assertIsNone(tracker.quantile(["unknown"], 1.0))
+
+    def test_timeout_falls_back_to_max_without_enough_samples(self):
+        tracker = LatencyTracker(min_samples=8)
+        for _ in range(7):
+            tracker.record("a", 1.0)
+
+        self.assertEqual(tracker.timeout_for(["a"], 0.95, 0.5, 0.1, 12), 12)
+
+        tracker.record("a", 1.0)
+        self.assertEqual(tracker.timeout_for(["a"], 0.95, 0.5, 0.1, 12), 1.5)
+
+    def test_timeout_clamped(self):
+        tracker = LatencyTracker(min_samples=1)
+        tracker.record("fast", 0.1)
+        tracker.record("slow", 30.0)
+
+        self.assertEqual(tracker.timeout_for(["fast"], 0.95, 0.5, 2, 12), 2)
+        self.assertEqual(tracker.timeout_for(["slow"], 0.95, 0.5, 2, 12), 12)
+
+    def test_failures_add_no_samples(self):
+        tracker = LatencyTracker(min_samples=1)
+        tracker.record("a", 1.0)
+        for _ in range(10):
+            tracker.record_failure("a")
+
+        self.assertEqual(tracker.get("a").failures, 10)
+        self.assertEqual(tracker.quantile(["a"], 1.0), 1.0)
+
+    def test_record_query_responses(self):
+        tracker = LatencyTracker(min_samples=1)
+
+        record_query_latency(tracker, create_response("a", 200, "1.5"))
+        record_query_latency(tracker, create_response("a", 408))
+
+        axon = bt.AxonInfo(
+            version=1,
+            ip="127.0.0.1",
+            port=8091,
+            ip_type=4,
+            hotkey="a",
+            coldkey="a",
+        )
+        record_query_latency(tracker, cut_off_response(bt.Synapse(), axon))
+
+        stats = tracker.get("a")
+        self.assertEqual(stats.successes, 1)
+        self.assertEqual(stats.failures, 1)
+        self.assertEqual(tracker.quantile(["a"], 0.5), 1.5)
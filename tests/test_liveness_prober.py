@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import unittest
+from typing import Set
+
+import torch
+
+from neurons.validator.history import MinerQueryHistory
+from neurons.validator.liveness import LivenessProber
+from neurons.validator.utils import get_random_uids
+
+
+class StandInAxon:
+    def __init__(self, uid: int):
+        self.hotkey = f"hotkey_{uid}"
+        self.coldkey = f"coldkey_{uid}"
+        self.is_serving = True
+
+
+class StandInMetagraph:
+    def __init__(self, n: int):
+        self.n = torch.tensor(n)
+        self.axons = [StandInAxon(uid) for uid in range(n)]
+        self.validator_permit = torch.zeros(n, dtype=torch.bool)
+        self.S = torch.zeros(n)
+
+    @property
+    def hotkeys(self):
+        return [axon.hotkey for axon in self.axons]
+
+    @property
+    def coldkeys(self):
+        return [axon.coldkey for axon in self.axons]
+
+
+class StandInValidator:
+    """Miners with an even UID are alive"""
+
+    def __init__(self, n: int = 32):
+        self.should_quit = threading.Event()
+        self.metagraph = StandInMetagraph(n)
+        self.hotkey_blacklist: Set[str] = set()
+        self.coldkey_blacklist: Set[str] = set()
+        self.probed = 0
+        self.query_history = MinerQueryHistory(self.metagraph.hotkeys)
+
+        self.liveness = LivenessProber(
+            self,
+            interval=0.01,
+            ttl=60,
+            concurrency=4,
+        )
+
+    async def check_uid(self, uid, response_times):
+        self.probed += 1
+        await asyncio.sleep(0)
+
+        alive: bool = uid % 2 == 0
+        self.liveness.record(uid, alive, 0.1 if alive else None)
+        return alive
+
+
+class TestLivenessProber(unittest.IsolatedAsyncioTestCase):
+    async def test_samples_from_background_probes(self):
+        validator = StandInValidator()
+
+        # Nothing probed yet, the candidates are probed on the spot
+        self.assertFalse(validator.liveness.is_fresh())
+
+        validator.liveness.start()
+        while not validator.liveness.is_fresh():
+            await asyncio.sleep(0.01)
+        await validator.liveness.stop()
+
+        self.assertEqual(len(validator.liveness.alive_uids), 16)
+
+        probed: int = validator.probed
+        uids = await get_random_uids(validator, k=6, exclude=[0, 2, 4])
+
+        # Sampling sends no probe
+        self.assertEqual(validator.probed, probed)
+        self.assertEqual(len(uids), 6)
+        for uid in uids.tolist():
+            self.assertEqual(uid % 2, 0)
+            self.assertNotIn(uid, [0, 2, 4])
+
+    async def test_stale_probes_not_trusted(self):
+        validator = StandInValidator()
+        await validator.liveness.sweep(list(range(32)))
+
+        validator.liveness.ttl = 0
+        self.assertFalse(validator.liveness.is_fresh())
+        self.assertEqual(validator.liveness.sample(4), [])
+
+    async def test_blacklisted_and_dead_miners_not_sampled(self):
+        validator = StandInValidator()
+        await validator.liveness.sweep(list(range(32)))
+
+        validator.hotkey_blacklist.add("hotkey_2")
+        validator.liveness.record(4, False)
+
+        uids = await get_random_uids(validator, k=32)
+        self.assertEqual(
+            sorted(uids.tolist()),
+            [uid for uid in range(0, 32, 2) if uid not in (2, 4)],
+        )
+
+    def test_alive_set_updates(self):
+        liveness = LivenessProber(None, interval=0, ttl=60, concurrency=1)
+        for uid in range(5):
+            liveness.record(uid, True)
+
+        liveness.record(1, False)
+        liveness.forget(4)
+        liveness.record(2, True)
+
+        self.assertEqual(sorted(liveness.alive_uids), [0, 2, 3])
+        for uid, position in liveness.alive_positions.items():
+            self.assertEqual(liveness.alive_uids[position], uid)
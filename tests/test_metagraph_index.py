@@ -0,0 +1,102 @@
+from unittest.mock import MagicMock
+
+import torch
+
+from neurons.utils.metagraph import (
+    get_coldkey,
+    get_metagraph_index,
+    get_stake,
+    get_uid,
+    rebuild_metagraph_index,
+)
+
+
+class MockAxon:
+    def __init__(self, uid: int):
+        self.hotkey = f"hotkey_{uid}"
+        self.coldkey = f"coldkey_{uid}"
+        self.is_serving = uid != 1
+
+
+class MockMetagraph:
+    """Mimics bittensor, which derives hotkeys from axons on access"""
+
+    def __init__(self, n: int):
+        self.sync(n)
+
+    def sync(self, n: int):
+        self.axons = [MockAxon(uid) for uid in range(n)]
+        self.S = torch.arange(n, dtype=torch.float32) * 10
+        self.validator_permit = torch.arange(n) >= 2
+
+    @property
+    def hotkeys(self):
+        return [axon.hotkey for axon in self.axons]
+
+    @property
+    def coldkeys(self):
+        return [axon.coldkey for axon in self.axons]
+
+
+def test_lookups_match_metagraph():
+    metagraph = MockMetagraph(8)
+
+    assert get_uid(metagraph, "hotkey_5") == 5
+    assert get_coldkey(metagraph, "hotkey_5") == "coldkey_5"
+    assert get_stake(metagraph, "hotkey_5") == 50.0
+
+    assert get_uid(metagraph, "unknown") is None
+    assert get_coldkey(metagraph, "unknown") is None
+    assert get_stake(metagraph, "unknown") is None
+
+
+def test_index_reused_until_sync():
+    metagraph = MockMetagraph(4)
+
+    index = rebuild_metagraph_index(metagraph)
+    assert get_metagraph_index(metagraph) is index
+
+    metagraph.sync(6)
+    assert get_uid(metagraph, "hotkey_5") == 5
+    assert get_metagraph_index(metagraph) is not index
+
+
+def test_plain_hotkey_lists_are_tracked():
+    metagraph = MagicMock()
+    metagraph.hotkeys = ["hotkey_a", "hotkey_b", "hotkey_a"]
+
+    # Duplicates resolve to the first UID, same as list.index
+    assert get_uid(metagraph, "hotkey_a") == 0
+    assert get_coldkey(metagraph, "hotkey_a") is None
+
+    metagraph.hotkeys = ["hotkey_b", "hotkey_a"]
+    assert get_uid(metagraph, "hotkey_a") == 1
+
+
+def test_eligible_mask_cached_until_blacklist_changes():
+    metagraph = MockMetagraph(6)
+    index = rebuild_metagraph_index(metagraph)
+
+    # 1 isn't serving, 3 to 5 are validators staking more than 25
+    assert index.get_available_mask(25).tolist() == [
+        True,
+        False,
+        True,
+        False,
+        False,
+        False,
+    ]
+
+    mask = index.get_eligible_mask(25, {"hotkey_0"}, set())
+    assert mask.tolist() == [False, False, True, False, False, False]
+
+    blacklisted = index.get_blacklist_mask(["hotkey_0"], [])
+    assert index.get_blacklist_mask({"hotkey_0"}, set()) is blacklisted
+
+    updated = index.get_blacklist_mask({"hotkey_0"}, {"coldkey_2"})
+    assert updated is not blacklisted
+    assert torch.nonzero(updated).flatten().tolist() == [0, 2]
+
+    # A sync builds a new index, with masks of its own
+    metagraph.sync(6)
+    assert get_metagraph_index(metagraph).blacklist_mask is None
@@ -0,0 +1,156 @@
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+import torch
+
+from neurons.validator.scoring.models.masks.duplicate import DuplicateFilter
+from neurons.validator.scoring.models.masks.hash_index import (
+    PerceptualHashIndex,
+    hamming_distances,
+)
+
+from tests.fixtures import create_complex_image
+from tests.test_duplicate_filter import create_synapse, mock_metagraph
+
+
+def create_index(path, capacity: int = 1000, max_age: float = 3600.0):
+    return PerceptualHashIndex(
+        path=str(path),
+        hash_bits=64,
+        max_distance=6,
+        capacity=capacity,
+        max_age=max_age,
+    )
+
+
+def random_hashes(rng, count: int) -> np.ndarray:
+    return rng.integers(0, 2**64, size=(count, 1), dtype=np.uint64)
+
+
+def flip_bits(image_hash: np.ndarray, bits) -> np.ndarray:
+    flipped = image_hash.copy()
+    for bit in bits:
+        flipped[0] ^= np.uint64(1) << np.uint64(bit)
+    return flipped
+
+
+def test_query_matches_brute_force(tmp_path):
+    rng = np.random.default_rng(0)
+    index = create_index(tmp_path)
+
+    stored = random_hashes(rng, 500)
+    # First half goes into the sorted arrays, second half stays pending
+    index.add(stored[:250], ["hotkey1"] * 250)
+    index.rebuild()
+    index.add(stored[250:], ["hotkey2"] * 250)
+
+    queries = [
+        flip_bits(stored[idx], rng.choice(64, size=flips, replace=False))
+        for idx, flips in zip(rng.integers(0, 500, size=40), range(40))
+    ]
+    queries += list(random_hashes(rng, 20))
+
+    for query in queries:
+        distances = hamming_distances(stored, query[None])
+        expected = sorted(distances[distances <= 6].tolist())
+
+        matches = index.query(query)
+        assert sorted(match.distance for match in matches) == expected
+
+
+def test_index_survives_reload(tmp_path):
+    rng = np.random.default_rng(1)
+    hashes = random_hashes(rng, 3)
+
+    index = create_index(tmp_path)
+    assert index.add(hashes[:2], ["hotkey1", "hotkey2"]) == 0
+    assert index.add(hashes[2:], ["hotkey3"]) == 1
+
+    reloaded = create_index(tmp_path)
+    assert len(reloaded) == 3
+
+    [match] = reloaded.query(flip_bits(hashes[2], [3, 17]))
+    assert match.hotkey == "hotkey3"
+    assert match.step == 1
+    assert match.distance == 2
+
+
+def test_oldest_hashes_evicted(tmp_path):
+    rng = np.random.default_rng(2)
+    hashes = random_hashes(rng, 6)
+
+    index = create_index(tmp_path, capacity=4)
+    for image_hash in hashes:
+        index.add(image_hash[None], ["hotkey1"])
+
+    assert len(index) == 4
+    assert index.query(hashes[0]) == []
+    assert index.query(hashes[1]) == []
+    assert all(index.query(image_hash) for image_hash in hashes[2:])
+
+
+def test_expired_hashes_ignored(tmp_path):
+    rng = np.random.default_rng(3)
+    image_hash = random_hashes(rng, 1)
+
+    with patch(
+        "neurons.validator.scoring.models.masks.hash_index.time.time",
+        return_value=1000.0,
+    ):
+        index = create_index(tmp_path, max_age=60)
+        index.add(image_hash, ["hotkey1"])
+        assert index.query(image_hash[0])
+
+    with patch(
+        "neurons.validator.scoring.models.masks.hash_index.time.time",
+        return_value=1061.0,
+    ):
+        assert index.query(image_hash[0]) == []
+
+        # Expired hashes are also dropped from the index on rebuild
+        index.rebuild()
+        assert index.candidates(index.chunk_keys(image_hash)[0]).size == 0
+
+
+@pytest.mark.asyncio
+async def test_replayed_image_flagged_across_steps(tmp_path, mock_metagraph):
+    with patch(
+        "neurons.validator.scoring.models.masks.duplicate.get_metagraph",
+        return_value=mock_metagraph,
+    ), patch(
+        "neurons.validator.scoring.models.base.get_metagraph",
+        return_value=mock_metagraph,
+    ):
+        duplicate_filter = DuplicateFilter(
+            hash_index_path=str(tmp_path),
+            hash_index_size=1000,
+            hash_index_max_age=3600,
+        )
+
+        def image():
+            return torch.tensor(np.array(create_complex_image())).permute(
+                2, 0, 1
+            )
+
+        replayed_image = image()
+
+        first_step = await duplicate_filter.get_rewards(
+            None,
+            [
+                create_synapse("hotkey1", [replayed_image]),
+                create_synapse("hotkey2", [image()]),
+            ],
+        )
+        assert torch.allclose(first_step, torch.zeros(5))
+
+        second_step = await duplicate_filter.get_rewards(
+            None,
+            [
+                create_synapse("hotkey2", [image()]),
+                create_synapse("hotkey3", [replayed_image]),
+            ],
+        )
+        assert torch.allclose(
+            second_step, torch.tensor([0.0, 0.0, 1.0, 0.0, 0.0])
+        )
@@ -0,0 +1,65 @@
+from typing import List, Set
+
+import numpy as np
+
+from neurons.validator.history import MinerQueryHistory
+
+
+def create_history(n: int) -> MinerQueryHistory:
+    return MinerQueryHistory([f"hotkey_{uid}" for uid in range(n)])
+
+
+def test_every_candidate_covered_in_fewest_steps():
+    history = create_history(40)
+    candidates: List[int] = list(range(0, 40, 2))
+
+    for _epoch in range(3):
+        queried: Set[int] = set()
+
+        # 20 candidates, 6 per step
+        for _step in range(4):
+            uids: List[int] = history.order(candidates)[:6]
+            queried.update(uids)
+            history.record(uids)
+
+        assert queried == set(candidates)
+
+    assert history.epoch == 2
+    assert history.counts[candidates].min() >= 3
+    assert history.counts[1] == 0
+
+
+def test_least_recently_queried_first():
+    history = create_history(6)
+    history.record([0, 1])
+    history.record([2, 3])
+    history.record([4, 5])
+
+    # Everyone was queried, a new epoch starts from the oldest
+    order: List[int] = history.order(list(range(6)))
+    assert history.epoch == 1
+    assert set(order[:2]) == {0, 1}
+    assert set(order[2:4]) == {2, 3}
+
+
+def test_unresponsive_miners_sit_out_the_epoch():
+    history = create_history(4)
+    history.record([0])
+
+    for _ in range(3):
+        history.record_failure(3)
+
+    assert history.queried_in_epoch[3]
+    assert history.order([1, 2, 3])[-1] == 3
+
+
+def test_sync_resets_replaced_and_new_miners():
+    history = create_history(3)
+    history.record([0, 1, 2])
+
+    history.sync(["hotkey_0", "replaced", "hotkey_2", "new"])
+
+    np.testing.assert_array_equal(history.counts, [1, 0, 1, 0])
+    np.testing.assert_array_equal(
+        history.queried_in_epoch, [True, False, True, False]
+    )
@@ -0,0 +1,106 @@
+import asyncio
+import time
+from typing import Dict, List
+from unittest.mock import patch
+
+import bittensor as bt
+
+from neurons.protocol import ImageGeneration
+from neurons.validator.forward import query_axons_async
+
+
+class StandInMetagraph:
+    def __init__(self, hotkeys: List[str]):
+        self.hotkeys = hotkeys
+        self.coldkeys = hotkeys
+
+
+class StandInDendrite:
+    """Miners answer successfully after their delay"""
+
+    def __init__(self, delays: Dict[str, float]):
+        self.delays = delays
+        self.cancelled: List[str] = []
+
+    async def forward(self, synapse, timeout, axons):
+        axon: bt.AxonInfo = axons[0]
+        try:
+            await asyncio.sleep(self.delays[axon.hotkey])
+        except asyncio.CancelledError:
+            self.cancelled.append(axon.hotkey)
+            raise
+
+        response = synapse.model_copy(deep=True)
+        response.axon = bt.TerminalInfo(hotkey=axon.hotkey)
+        response.dendrite.status_code = 200
+        return [response]
+
+
+def create_axon(hotkey: str) -> bt.AxonInfo:
+    return bt.AxonInfo(
+        version=1,
+        ip="127.0.0.1",
+        port=8091,
+        ip_type=4,
+        hotkey=hotkey,
+        coldkey=hotkey,
+    )
+
+
+async def collect(delays: List[float], **kwargs):
+    hotkeys = [f"hotkey_{i}" for i in range(len(delays))]
+    dendrite = StandInDendrite(dict(zip(hotkeys, delays)))
+
+    with patch(
+        "neurons.validator.forward.get_metagraph",
+        return_value=StandInMetagraph(hotkeys),
+    ):
+        start = time.perf_counter()
+        results = [
+            (uid, response)
+            async for uid, response in query_axons_async(
+                dendrite,
+                [create_axon(hotkey) for hotkey in hotkeys],
+                ImageGeneration(prompt="test"),
+                **kwargs,
+            )
+        ]
+
+    return results, dendrite, time.perf_counter() - start
+
+
+def test_stragglers_cut_off_once_quorum_reached():
+    results, dendrite, elapsed = asyncio.run(
+        collect([0.01, 0.02, 0.03, 0.04, 5, 5], quorum=4, soft_timeout=10)
+    )
+
+    assert elapsed < 1
+    assert [uid for uid, _ in results] == [0, 1, 2, 3, 4, 5]
+    assert all(response.is_success for _, response in results[:4])
+
+    # The slowest miners are recorded as timeouts
+    for uid, response in results[4:]:
+        assert response.is_timeout
+        assert response.axon.hotkey == f"hotkey_{uid}"
+    assert sorted(dendrite.cancelled) == ["hotkey_4", "hotkey_5"]
+
+
+def test_soft_deadline_without_quorum():
+    results, _dendrite, elapsed = asyncio.run(
+        collect([0.01, 5, 5], quorum=3, soft_timeout=0.1)
+    )
+
+    assert elapsed < 1
+    assert [response.is_success for _, response in results] == [
+        True,
+        False,
+        False,
+    ]
+
+
+def test_every_miner_awaited_without_quorum():
+    results, dendrite, _elapsed = asyncio.run(collect([0.03, 0.01, 0.02]))
+
+    assert [uid for uid, _ in results] == [1, 2, 0]
+    assert all(response.is_success for _, response in results)
+    assert dendrite.cancelled == []
@@ -0,0 +1,73 @@
+import torch
+from transformers import CLIPConfig
+
+from neurons.safety import StableDiffusionSafetyChecker, cosine_distance
+
+
+def create_safety_checker() -> StableDiffusionSafetyChecker:
+    torch.manual_seed(0)
+
+    config = CLIPConfig(
+        projection_dim=16,
+        vision_config={
+            "hidden_size": 32,
+            "intermediate_size": 64,
+            "num_attention_heads": 2,
+            "num_hidden_layers": 1,
+            "image_size": 32,
+            "patch_size": 8,
+        },
+    )
+    checker = StableDiffusionSafetyChecker(config).eval()
+
+    checker.concept_embeds.data = torch.randn(17, 16)
+    checker.special_care_embeds.data = torch.randn(3, 16)
+    checker.concept_embeds_weights.data = torch.full((17,), 0.5)
+    return checker
+
+
+def reference_detect_nsfw(checker, clip_input):
+    with torch.no_grad():
+        pooled_output = checker.vision_model(clip_input)[1]
+        image_embeds = checker.visual_projection(pooled_output)
+        cos_dist = cosine_distance(image_embeds, checker.concept_embeds)
+
+    result = []
+    for i in range(cos_dist.shape[0]):
+        bad_concepts = []
+        bad_score = 0.0
+        for concept_idx in range(cos_dist.shape[1]):
+            threshold = checker.concept_embeds_weights[concept_idx].item()
+            score = round(cos_dist[i][concept_idx].item() - threshold, 3)
+            if score > 0:
+                bad_concepts.append(concept_idx)
+                bad_score += score
+        result.append(len(bad_concepts) > 0 and bad_score > 0.01)
+    return result
+
+
+def test_detect_nsfw_matches_per_concept_loop():
+    checker = create_safety_checker()
+    clip_input = torch.randn(16, 3, 32, 32)
+
+    expected = reference_detect_nsfw(checker, clip_input)
+    has_nsfw_concept = checker.detect_nsfw(clip_input)
+
+    assert has_nsfw_concept.dtype == torch.bool
+    assert has_nsfw_concept.tolist() == expected
+    # Make sure the fixture exercises both outcomes
+    assert any(expected) and not all(expected)
+
+
+def test_forward_keeps_images_and_returns_flags():
+    checker = create_safety_checker()
+    clip_input = torch.randn(4, 3, 32, 32)
+    images = ["a", "b", "c", "d"]
+
+    returned_images, has_nsfw_concepts = checker.forward(
+        clip_input=clip_input,
+        images=images,
+    )
+
+    assert returned_images is images
+    assert has_nsfw_concepts == checker.detect_nsfw(clip_input).tolist()
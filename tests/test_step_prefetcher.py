@@ -0,0 +1,136 @@
+import asyncio
+import threading
+import unittest
+from typing import List
+from unittest.mock import patch
+
+import torch
+
+from neurons.protocol import ModelType, denormalize_image_model
+from neurons.validator.config import get_config
+from neurons.validator.executor import StepPrefetcher
+
+
+def create_task(task_id: str):
+    return denormalize_image_model(
+        id=task_id,
+        image_count=1,
+        task_type="TEXT_TO_IMAGE",
+        guidance_scale=7.5,
+        negative_prompt=None,
+        prompt="test",
+        seed=-1,
+        steps=50,
+        width=64,
+        height=64,
+    )
+
+
+class StandInValidator:
+    def __init__(self, fetch_seconds: float = 0.05):
+        self.config = get_config()
+        self.should_quit = threading.Event()
+        self.step = 0
+        self.device = torch.device("cpu")
+        self.model_type = ModelType.CUSTOM
+
+        self.fetch_seconds = fetch_seconds
+        self.fetched: List[str] = []
+
+    async def get_image_generation_task(self):
+        await asyncio.sleep(self.fetch_seconds)
+
+        task_id: str = str(len(self.fetched))
+        self.fetched.append(task_id)
+        return create_task(task_id)
+
+
+async def random_uids(_validator, k: int, exclude=None) -> torch.Tensor:
+    # 24 miners, the first k that aren't excluded
+    await asyncio.sleep(0)
+    available = [uid for uid in range(24) if uid not in (exclude or [])]
+    return torch.tensor(available[:k], dtype=torch.long)
+
+
+@patch("neurons.validator.executor.get_random_uids", random_uids)
+class TestStepPrefetcher(unittest.IsolatedAsyncioTestCase):
+    async def test_next_step_prepared_while_running(self):
+        validator = StandInValidator(fetch_seconds=0.05)
+        prefetcher = StepPrefetcher(validator, depth=1)
+
+        task_ids: List[str] = []
+        loop = asyncio.get_running_loop()
+        start: float = loop.time()
+        for _ in range(4):
+            step = await prefetcher.next_step(timeout=5)
+            task_ids.append(step.task.task_id)
+
+            # Running the step takes as long as fetching a task
+            await asyncio.sleep(0.05)
+            prefetcher.release(step)
+
+        await prefetcher.stop()
+
+        # Steps run in the order they were prepared
+        self.assertEqual(task_ids, ["0", "1", "2", "3"])
+
+        # Sequentially that would be 4 * (0.05 + 0.05)
+        self.assertLess(loop.time() - start, 0.35)
+
+    async def test_prepared_steps_bounded_by_depth(self):
+        validator = StandInValidator(fetch_seconds=0)
+        prefetcher = StepPrefetcher(validator, depth=2)
+        prefetcher.start()
+
+        await asyncio.sleep(0.1)
+        self.assertEqual(len(validator.fetched), 2)
+
+        step = await prefetcher.next_step(timeout=5)
+        self.assertEqual(step.task.task_id, "0")
+        prefetcher.release(step)
+
+        await asyncio.sleep(0.1)
+        self.assertEqual(len(validator.fetched), 3)
+
+        await prefetcher.stop()
+
+    async def test_failed_preparations_are_skipped(self):
+        validator = StandInValidator(fetch_seconds=0)
+        prefetcher = StepPrefetcher(validator, depth=1, retry_delay=0)
+
+        with patch.object(
+            validator,
+            "get_image_generation_task",
+            side_effect=[None, create_task("organic")],
+        ):
+            step = await prefetcher.next_step(timeout=5)
+
+        await prefetcher.stop()
+
+        self.assertEqual(step.task.task_id, "organic")
+        self.assertTrue(torch.equal(step.uids, torch.arange(12)))
+
+    async def test_concurrent_steps_get_disjoint_uids(self):
+        validator = StandInValidator(fetch_seconds=0)
+        prefetcher = StepPrefetcher(validator, depth=3, retry_delay=0.01)
+
+        first = await prefetcher.next_step(timeout=5)
+        second = await prefetcher.next_step(timeout=5)
+
+        # 24 miners only fit two steps of 12
+        self.assertEqual(
+            set(first.uids.tolist()) & set(second.uids.tolist()),
+            set(),
+        )
+        self.assertIsNone(await prefetcher.next_step(timeout=0.1))
+        self.assertEqual(len(prefetcher.reserved_uids), 24)
+
+        # A finished step frees its UIDs for the next one
+        prefetcher.release(first)
+        third = await prefetcher.next_step(timeout=5)
+        self.assertEqual(
+            set(third.uids.tolist()) & set(second.uids.tolist()),
+            set(),
+        )
+
+        await prefetcher.stop()
@@ -220,3 +220,25 @@ async def test_ones_rewards(*args):
     assert (
         abs(actual_sum - expected_sum) < 1e-5
     ), f"Expected sum to be close to {expected_sum}, but got {actual_sum}"
+
+
+@pytest.mark.asyncio
+@patch_all_dependencies
+async def test_blacklisted_miners_zeroed(*args):
+    moving_average_scores = torch.ones(256)
+    rewards_tensor = torch.ones(256)
+    scoring_results = ScoringResults(
+        combined_scores=rewards_tensor, combined_uids=torch.arange(256)
+    )
+
+    moving_average_scores = await update_moving_averages(
+        moving_average_scores,
+        scoring_results,
+        hotkey_blacklist={"hotkey_3"},
+        coldkey_blacklist={"coldkey_7"},
+    )
+
+    assert torch.nonzero(moving_average_scores == 0).flatten().tolist() == [
+        3,
+        7,
+    ]
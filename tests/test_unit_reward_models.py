@@ -16,7 +16,12 @@ from neurons.utils.image import (
     image_tensor_to_base64,
     bytesio_to_base64,
 )
-from neurons.validator.scoring.models import ImageRewardModel
+from neurons.validator.scoring.models import (
+    EmptyScoreRewardModel,
+    ImageRewardModel,
+    RewardModelType,
+)
+from neurons.validator.scoring.models.base import BaseRewardModel
 from neurons.validator.scoring.models.masks.blacklist import BlacklistFilter
 from neurons.validator.scoring.models.masks.nsfw import NSFWRewardModel
 from tests.fixtures import TEST_IMAGES
@@ -176,3 +181,63 @@ async def test_image_reward_model(mock_meta, image_reward_model):
     assert (
         rewards.shape[0] == 5
     )  # Ensure we have rewards for all hotkeys in the mock metagraph
+
+
+class CountingRewardModel(BaseRewardModel):
+    @property
+    def name(self) -> RewardModelType:
+        return RewardModelType.EMPTY
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    async def get_rewards_batch(self, _synapse, responses):
+        self.batches.append(len(responses))
+        return torch.tensor(
+            [float(response.height) for response in responses]
+        )
+
+
+@pytest.mark.asyncio
+@patch(
+    "neurons.validator.scoring.models.base.get_metagraph",
+    return_value=mock_meta,
+)
+async def test_rewards_batch_scattered_by_uid(mock_meta):
+    model = CountingRewardModel()
+
+    responses = [
+        create_mock_synapse([], 3, 64, "hotkey_3"),
+        create_mock_synapse([], 7, 64, "unknown_hotkey"),
+        create_mock_synapse([], 1, 64, "hotkey_1"),
+    ]
+
+    rewards = await model.get_rewards(responses[0], responses)
+
+    # Only valid responses are scored, all in a single batch
+    assert model.batches == [2]
+    assert torch.equal(rewards, torch.tensor([0.0, 1.0, 0.0, 3.0, 0.0]))
+
+
+@pytest.mark.asyncio
+@patch(
+    "neurons.validator.scoring.models.base.get_metagraph",
+    return_value=mock_meta,
+)
+async def test_rewards_batch_falls_back_to_get_reward(mock_meta):
+    class PerResponseRewardModel(EmptyScoreRewardModel):
+        def get_reward(self, response) -> float:
+            return float(response.width)
+
+    responses = [
+        create_mock_synapse([], 64, 2, "hotkey_2"),
+        create_mock_synapse([], 64, 4, "hotkey_4"),
+    ]
+
+    rewards = await PerResponseRewardModel().get_rewards(
+        responses[0],
+        responses,
+    )
+
+    assert torch.equal(rewards, torch.tensor([0.0, 0.0, 2.0, 0.0, 4.0]))
@@ -0,0 +1,159 @@
+import asyncio
+import os
+import queue
+import threading
+from typing import List
+
+import httpx
+
+from neurons.validator.schemas import Batch
+from neurons.validator.spool import BatchSpool
+from neurons.validator.uploader import BatchUploader
+
+
+def create_batch(batch_id: str) -> Batch:
+    return Batch(
+        batch_id=batch_id,
+        prompt="test",
+        computes=["x" * 100],
+        nsfw_scores=[],
+        miner_hotkeys=[],
+        miner_coldkeys=[],
+        validator_hotkey="fake_hotkey",
+    )
+
+
+def create_spool(path: str, max_memory: int = 1 << 20) -> BatchSpool:
+    return BatchSpool(path, max_memory=max_memory, segment_size=1024)
+
+
+def segment_files(path: str) -> List[str]:
+    return sorted(name for name in os.listdir(path) if name.endswith(".jsonl"))
+
+
+def test_drains_in_order_and_compacts(tmp_path):
+    spool = create_spool(str(tmp_path))
+    for i in range(40):
+        spool.append(create_batch(str(i)))
+
+    assert len(segment_files(str(tmp_path))) > 3
+
+    popped = []
+    while (item := spool.pop()) is not None:
+        popped.append(item)
+        spool.ack(item[0])
+
+    assert [batch.batch_id for _seq, batch in popped] == [
+        str(i) for i in range(40)
+    ]
+    assert len(spool) == 0
+
+    # Only the segment still being written to is left
+    assert len(segment_files(str(tmp_path))) == 1
+
+
+def test_pending_batches_survive_restart(tmp_path):
+    spool = create_spool(str(tmp_path))
+    for i in range(20):
+        spool.append(create_batch(str(i)))
+
+    # 0-4 uploaded, 5 put back for later, 6 uploaded out of order
+    for _ in range(7):
+        seq, batch = spool.pop()
+        if seq == 5:
+            spool.retry(seq, batch)
+        else:
+            spool.ack(seq)
+
+    assert spool.pop()[1].batch_id == "5"
+    spool.close()
+
+    # A crash mid write leaves a torn record behind
+    last = os.path.join(str(tmp_path), segment_files(str(tmp_path))[-1])
+    with open(last, "ab") as segment:
+        segment.write(b'{"seq": 20, "batch": {"batch_')
+
+    reopened = create_spool(str(tmp_path))
+    assert reopened.head == 5
+    assert len(reopened) == 15
+
+    reopened.append(create_batch("20"))
+
+    batch_ids = []
+    while (item := reopened.pop()) is not None:
+        batch_ids.append(item[1].batch_id)
+
+    # Out of order acks are not kept, so 6 is uploaded again
+    assert batch_ids == [str(i) for i in range(5, 21)]
+
+
+def test_memory_bounded_to_read_ahead_window(tmp_path):
+    spool = create_spool(str(tmp_path), max_memory=1000)
+    for i in range(50):
+        spool.append(create_batch(str(i)))
+
+    for i in range(50):
+        seq, batch = spool.pop()
+        assert batch.batch_id == str(i)
+        assert len(spool.window) <= 4
+        spool.ack(seq)
+
+
+class FlakyBackendClient:
+    """Unreachable for the first `failures` posts"""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.uploaded: List[str] = []
+
+    async def post_batch(self, batch: Batch) -> httpx.Response:
+        if self.failures > 0:
+            self.failures -= 1
+            return httpx.Response(503)
+
+        self.uploaded.append(batch.batch_id)
+        return httpx.Response(200)
+
+    def _error_response_text(self, response: httpx.Response) -> str:
+        return response.text
+
+
+def test_uploader_keeps_batches_until_backend_recovers(tmp_path):
+    async def run():
+        batches_upload_queue = queue.Queue()
+        should_quit = threading.Event()
+        backend_client = FlakyBackendClient(failures=7)
+        spool = create_spool(str(tmp_path))
+
+        uploader = BatchUploader(
+            backend_client,
+            batches_upload_queue,
+            should_quit,
+            workers=1,
+            max_attempts=2,
+            max_backoff=0.01,
+            metrics_interval=60,
+            poll_timeout=0.01,
+            spool=spool,
+        )
+
+        for i in range(10):
+            batches_upload_queue.put(create_batch(str(i)))
+
+        task = asyncio.create_task(uploader.run())
+        while len(backend_client.uploaded) < 10:
+            await asyncio.sleep(0.01)
+
+        should_quit.set()
+        await asyncio.wait_for(task, timeout=5)
+
+        return backend_client.uploaded, uploader.metrics, spool
+
+    uploaded, metrics, spool = asyncio.run(run())
+
+    # Every batch exactly once, a batch already handed out may
+    # overtake one that is put back
+    assert sorted(uploaded, key=int) == [str(i) for i in range(10)]
+    assert metrics.requeued == 3
+    assert metrics.failed == 0
+    assert len(spool) == 0
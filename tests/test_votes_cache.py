@@ -0,0 +1,117 @@
+import asyncio
+import json
+import unittest
+from typing import Dict
+from unittest.mock import patch
+
+import bittensor as bt
+import torch
+
+from neurons.utils.metagraph import MetagraphIndex
+from neurons.validator.backend.client import TensorAlchemyBackendClient
+from neurons.validator.scoring.models.rewards.human import VotesCache
+from tests.test_backend_client_pool import StandInBackend
+
+
+class StandInVotesBackend(StandInBackend):
+    """Answers 304 Not Modified while the votes are unchanged"""
+
+    def __init__(self):
+        super().__init__()
+        self.version = 1
+        self.votes: Dict = {"round_1": {"hotkey_0": 1, "hotkey_1": 2}}
+
+    def respond(self, headers: Dict[str, str]) -> bytes:
+        etag: str = f'"{self.version}"'
+        if headers.get("if-none-match") == etag:
+            return b"HTTP/1.1 304 Not Modified\r\nContent-Length: 0\r\n\r\n"
+
+        body = json.dumps(self.votes).encode()
+        return (
+            b"HTTP/1.1 200 OK\r\n"
+            + b"Content-Type: application/json\r\n"
+            + f"ETag: {etag}\r\n".encode()
+            + f"Content-Length: {len(body)}\r\n\r\n".encode()
+            + body
+        )
+
+
+class StandInMetagraph:
+    def __init__(self, n: int):
+        self.hotkeys = [f"hotkey_{uid}" for uid in range(n)]
+
+
+class TestVotesCache(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.backend = StandInVotesBackend()
+        await self.backend.start()
+
+        mnemonic = bt.Keypair.generate_mnemonic(12)
+        self.client = TensorAlchemyBackendClient(
+            hotkey=bt.Keypair.create_from_mnemonic(mnemonic),
+            api_url=self.backend.url,
+        )
+
+        patcher = patch(
+            "neurons.validator.scoring.models.rewards.human.get_backend_client",
+            return_value=self.client,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.backend.stop()
+
+    async def test_unchanged_votes_not_sent_again(self):
+        first = await self.client.get_votes()
+        second = await self.client.get_votes()
+
+        self.assertIs(first, second)
+        self.assertEqual(self.backend.requests[1]["if-none-match"], '"1"')
+
+        self.backend.version = 2
+        self.backend.votes = {"round_1": {"hotkey_0": 5}}
+        self.assertEqual(await self.client.get_votes(), self.backend.votes)
+
+    async def test_scores_by_uid(self):
+        cache = VotesCache(interval=60)
+        index = MetagraphIndex(StandInMetagraph(3))
+
+        scores: torch.Tensor = await cache.get_uid_scores(index)
+        self.assertEqual(scores.tolist(), [1.0, 2.0, 0.0])
+
+        # Fresh, so read without asking the backend
+        self.assertIs(await cache.get_uid_scores(index), scores)
+        self.assertEqual(len(self.backend.requests), 1)
+
+        # A new state of the metagraph gets its own tensor
+        other = MetagraphIndex(StandInMetagraph(4))
+        self.assertEqual(
+            (await cache.get_uid_scores(other)).tolist(),
+            [1.0, 2.0, 0.0, 0.0],
+        )
+
+    async def test_refreshed_in_background(self):
+        cache = VotesCache(interval=0.01)
+        index = MetagraphIndex(StandInMetagraph(2))
+
+        cache.start()
+        while cache.votes is None:
+            await asyncio.sleep(0.01)
+
+        scores: torch.Tensor = await cache.get_uid_scores(index)
+        self.assertEqual(scores.tolist(), [1.0, 2.0])
+
+        # Unchanged votes don't rebuild the scores
+        requests: int = len(self.backend.requests)
+        while len(self.backend.requests) < requests + 2:
+            await asyncio.sleep(0.01)
+        self.assertIs(await cache.get_uid_scores(index), scores)
+
+        self.backend.version = 2
+        self.backend.votes = {"round_1": {"hotkey_1": 7}}
+        while (await cache.get_uid_scores(index)).tolist() != [0.0, 7.0]:
+            await asyncio.sleep(0.01)
+
+        await cache.stop()